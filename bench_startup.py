@@ -0,0 +1,223 @@
+"""
+Headless startup benchmark for Hixs Browser
+Launches brave.py's ModernWebBrowser with the offscreen Qt platform in fresh
+profiles and reports median timings and memory. No display or network needed.
+
+    python bench_startup.py --runs 5 --tabs 10
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Local page loaded by the first tab and every extra tab
+BENCH_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Hixs Benchmark Page</title>
+    <style>
+        body { font-family: sans-serif; margin: 40px; }
+        .card { padding: 10px; margin: 6px 0; border-radius: 6px; background: #f0f0f0; }
+    </style>
+</head>
+<body>
+    <h1>Hixs Benchmark Page</h1>
+    %s
+</body>
+</html>
+"""
+
+# Metrics reported by a child run, in display order
+METRICS = [
+    ("import_ms", "Import brave.py", "ms"),
+    ("window_ms", "Window constructed", "ms"),
+    ("first_paint_ms", "First paint", "ms"),
+    ("first_load_ms", "First tab loadFinished", "ms"),
+    ("startup_rss_mb", "RSS after startup (all processes)", "MB"),
+    ("tabs_ms", "Open and load extra tabs", "ms"),
+    ("tabs_rss_mb", "RSS after extra tabs (all processes)", "MB"),
+]
+
+
+def ms_since(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def run_until(app, condition, timeout):
+    """Process events until condition() holds; returns False on timeout"""
+    from PyQt5.QtCore import QEventLoop
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents(QEventLoop.AllEvents, 50)
+    return True
+
+
+def total_rss_mb(brave, window):
+    """Resident memory of the browser process plus every tab's renderer"""
+    sampler = brave.ProcessSampler()
+    pids = {os.getpid()}
+    for index in range(window.tabs.count()):
+        pid = window.tabs.widget(index).page().renderProcessPid()
+        if pid:
+            pids.add(pid)
+    sizes = [sampler.memory_mb(pid) for pid in pids]
+    return round(sum(size for size in sizes if size is not None), 1)
+
+
+def child_run(args):
+    """One measured startup; runs inside the benchmark's child process"""
+    start = time.perf_counter()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from PyQt5.QtCore import QSettings, QUrl
+    from PyQt5.QtWidgets import QMessageBox
+    import brave
+    result = {"import_ms": ms_since(start)}
+
+    # Open the local page instead of the network homepage and never block on prompts
+    page_url = QUrl.fromLocalFile(args.page).toString()
+    brave.ModernWebBrowser.get_homepage = lambda self: page_url
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.No)
+
+    profiler = brave.StartupProfiler(os.path.join(os.path.dirname(args.child), "profile.json"))
+    profiler.mark("imports")
+    app = brave.create_application([sys.argv[0]])
+    profiler.mark("qapplication")
+    QSettings("HixsBrowser", "HixsBrowser").setValue("privacy_agreed", True)
+    window = brave.ModernWebBrowser(profiler)
+    window.show()
+    result["window_ms"] = ms_since(start)
+
+    first_tab = window.tabs.currentWidget()
+    loads = []
+    first_tab.loadFinished.connect(lambda ok: loads.append((ms_since(start), ok)))
+    if run_until(app, lambda: loads, args.timeout):
+        result["first_load_ms"], result["first_load_ok"] = loads[0]
+    run_until(app, lambda: "first_paint" in profiler.events, 1)
+    if "first_paint" in profiler.events:
+        # Profiler times count from brave.STARTUP_TIME, not from this process's start
+        result["first_paint_ms"] = (brave.STARTUP_TIME - start) * 1000 + profiler.events["first_paint"]
+    result["startup_rss_mb"] = total_rss_mb(brave, window)
+
+    finished = []
+    tabs_start = time.perf_counter()
+    for i in range(args.tabs):
+        # A query string keeps the spare tab pool out of the measurement
+        view = window.add_new_tab(f"{page_url}?tab={i}")
+        view.loadFinished.connect(lambda ok: finished.append(ok))
+    if run_until(app, lambda: len(finished) >= args.tabs, args.timeout):
+        result["tabs_ms"] = ms_since(tabs_start)
+        result["tabs_rss_mb"] = total_rss_mb(brave, window)
+    result["phases"] = {phase["phase"]: phase["duration_ms"] for phase in profiler.report()["phases"]}
+
+    with open(args.child, "w") as f:
+        json.dump(result, f)
+    window.close()
+    app.quit()
+
+
+def bench_run(args):
+    """Start one child process in a throwaway profile and return its measurements"""
+    with tempfile.TemporaryDirectory(prefix="hixs-bench-") as home:
+        env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen",
+                   XDG_CONFIG_HOME=os.path.join(home, "config"),
+                   XDG_DATA_HOME=os.path.join(home, "data"),
+                   XDG_CACHE_HOME=os.path.join(home, "cache"),
+                   XDG_RUNTIME_DIR=home)
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            # Chromium refuses to sandbox renderers when running as root
+            env.setdefault("QTWEBENGINE_DISABLE_SANDBOX", "1")
+        page = args.page
+        if not page:
+            page = os.path.join(home, "bench.html")
+            with open(page, "w") as f:
+                f.write(BENCH_PAGE % "\n    ".join(
+                    f'<div class="card">Item {i}: benchmark content</div>' for i in range(200)))
+        result_path = os.path.join(home, "result.json")
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", result_path,
+               "--page", os.path.abspath(page), "--tabs", str(args.tabs), "--timeout", str(args.timeout)]
+        output = None if args.verbose else subprocess.DEVNULL
+        try:
+            subprocess.run(cmd, env=env, stdout=output, stderr=output, timeout=args.timeout * 3)
+        except subprocess.TimeoutExpired:
+            print("  run timed out")
+            return None
+        if not os.path.exists(result_path):
+            print("  run failed (use --verbose to see its output)")
+            return None
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def summarize(results):
+    """Median, min and max of every metric across runs"""
+    summary = {}
+    for key, _, _ in METRICS:
+        values = [result[key] for result in results if key in result]
+        if values:
+            summary[key] = {"median": round(statistics.median(values), 1),
+                            "min": round(min(values), 1), "max": round(max(values), 1)}
+    phases = {}
+    for result in results:
+        for phase, duration in result.get("phases", {}).items():
+            phases.setdefault(phase, []).append(duration)
+    summary["phases"] = {phase: round(statistics.median(values), 1) for phase, values in phases.items()}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless startup benchmark for Hixs Browser")
+    parser.add_argument("--runs", type=int, default=5, help="measured runs (default 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs first (default 1)")
+    parser.add_argument("--tabs", type=int, default=10, help="extra tabs opened after startup (default 10)")
+    parser.add_argument("--page", help="local HTML file to load instead of the built-in page")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait for each load stage")
+    parser.add_argument("--json", help="also write the summary and raw runs to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the browser's output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_run(args)
+        return 0
+
+    results = []
+    for index in range(args.warmup + args.runs):
+        label = "warmup" if index < args.warmup else f"run {index - args.warmup + 1}/{args.runs}"
+        print(f"Benchmark {label}...")
+        result = bench_run(args)
+        if result is not None and index >= args.warmup:
+            results.append(result)
+    if not results:
+        print("No successful runs")
+        return 1
+
+    summary = summarize(results)
+    print("\n" + "=" * 68)
+    print(f"{'Metric':<44}{'median':>8}{'min':>8}{'max':>8}")
+    print("=" * 68)
+    for key, label, unit in METRICS:
+        if key in summary:
+            stats = summary[key]
+            print(f"{label + ' (' + unit + ')':<44}{stats['median']:>8.1f}{stats['min']:>8.1f}{stats['max']:>8.1f}")
+    print("\nMedian startup phases (ms):")
+    for phase, duration in summary["phases"].items():
+        print(f"  {phase:<20}{duration:>8.1f}")
+    print(f"\n{len(results)} of {args.runs} runs succeeded, {args.tabs} extra tabs each")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"summary": summary, "runs": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
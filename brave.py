@@ -5,33 +5,46 @@ import re
 import warnings
 import threading
 import time
+import queue
+import sqlite3
+import shutil
+import tempfile
+import glob
+import bisect
+import heapq
 from urllib.parse import urlparse, quote, unquote
 from datetime import datetime
+from html import escape
 
 # Suppress deprecation warnings for PyQt5
 warnings.filterwarnings('ignore', category=DeprecationWarning)
 
+# Reference point for --profile-startup, taken before the Qt modules load
+STARTUP_TIME = time.perf_counter()
+
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget,
                              QLineEdit, QPushButton, QToolBar, QTabWidget,
-                             QStatusBar, QProgressBar, QLabel, QHBoxLayout,
+                             QStatusBar, QProgressBar, QLabel, QHBoxLayout, QProgressDialog,
                              QMenu, QAction, QFileDialog, QMessageBox, QShortcut,
                              QInputDialog, QDialog, QDialogButtonBox, QFrame,
                              QListWidget, QListWidgetItem, QAbstractItemView,
                              QTreeWidget, QTreeWidgetItem, QHeaderView, QSplitter,
                              QTabBar, QStyle, QToolButton, QSizePolicy, QScrollArea,
                              QPlainTextEdit, QComboBox, QCheckBox, QGridLayout,
-                             QGroupBox, QSlider, QSystemTrayIcon)
+                             QGroupBox, QSlider, QSystemTrayIcon, QCompleter, QSpinBox)
 from PyQt5.QtPrintSupport import QPrintDialog, QPrinter
 from PyQt5.QtWebEngineWidgets import (QWebEngineView, QWebEngineSettings, 
                                       QWebEngineProfile, QWebEnginePage,
-                                      QWebEngineDownloadItem)
-from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+                                      QWebEngineDownloadItem, QWebEngineScript)
+from PyQt5.QtWebEngineCore import (QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo,
+                                   QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob)
 from PyQt5.QtCore import (QUrl, Qt, QTimer, pyqtSignal, QSettings, QStandardPaths, 
                           QPoint, QSize, QEvent, QThread, QObject, QFile, QIODevice,
-                          QByteArray, QDataStream)
+                          QByteArray, QDataStream, QBuffer)
 from PyQt5.QtGui import (QIcon, QFont, QKeySequence, QPixmap, QPainter, QCursor, 
-                         QColor, QPalette, QDesktopServices, QCloseEvent)
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+                         QColor, QPalette, QDesktopServices, QCloseEvent,
+                         QStandardItemModel, QStandardItem)
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply, QLocalServer, QLocalSocket
 
 # Search engines configuration - FIXED: removed trailing spaces
 SEARCH_ENGINES = {
@@ -45,6 +58,149 @@ SEARCH_ENGINES = {
     "Ecosia": "https://www.ecosia.org/search?q="
 }
 
+# Default keyword shortcuts: "!w qt" or "qt !w" searches Wikipedia for "qt". They are
+# bang-only so ordinary queries such as "so what" or "maps near me" stay web searches;
+# keywords the user adds without a "!" also work bare.
+KEYWORD_ENGINES = {
+    "!g": "https://www.google.com/search?q=",
+    "!ddg": "https://duckduckgo.com/?q=",
+    "!w": "https://en.wikipedia.org/wiki/Special:Search?search=",
+    "!yt": "https://www.youtube.com/results?search_query=",
+    "!gh": "https://github.com/search?q=",
+    "!so": "https://stackoverflow.com/search?q=",
+    "!py": "https://docs.python.org/3/search.html?q=",
+    "!maps": "https://www.google.com/maps/search/",
+}
+
+# Dark mode stylesheet and the script that installs it. It runs at document
+# creation, before <html> exists, so it waits for the root element with a
+# MutationObserver; observer callbacks run before the first paint.
+DARK_MODE_SCRIPT_NAME = "hixs-dark-mode"
+DARK_MODE_CSS = """
+    html {
+        filter: invert(1) hue-rotate(180deg) !important;
+        background-color: #111 !important;
+    }
+    img:not([src*=".svg"]),
+    video,
+    canvas,
+    [style*="background-image"] {
+        filter: invert(1) hue-rotate(180deg) !important;
+    }
+    iframe {
+        filter: invert(1) hue-rotate(180deg) !important;
+    }
+"""
+# Opts a page out of Chromium's own force-dark rendering
+DARK_MODE_OPT_OUT_CSS = ":root { color-scheme: only light !important; }"
+
+# Chromium's built-in dark rendering; process-wide, so it is chosen at startup
+NATIVE_DARK_MODE_FLAG = "--blink-settings=forceDarkModeEnabled=true"
+DARK_MODE_ENGINES = {"native": "Native (Chromium)", "css": "CSS Filter"}
+DARK_MODE_SITE_MODES = {"native": "Native", "css": "CSS Filter", "off": "Off"}
+
+# Per-site mode overrides are baked into the script, so deciding what to
+# do costs one object lookup in the page
+DARK_MODE_JS = """
+(function() {
+    var overrides = %(overrides)s;
+    var mode = overrides[location.hostname] || %(default_mode)s;
+    var css = '';
+    if (%(native)s && mode !== 'native') css += %(opt_out_css)s;
+    if (mode === 'css' || (mode === 'native' && !%(native)s)) css += %(dark_css)s;
+    if (!css) return;
+    function apply() {
+        if (document.getElementById('hixs-dark-mode')) return true;
+        var root = document.head || document.documentElement;
+        if (!root) return false;
+        var style = document.createElement('style');
+        style.id = 'hixs-dark-mode';
+        style.textContent = css;
+        root.appendChild(style);
+        return true;
+    }
+    if (!apply()) {
+        new MutationObserver(function(mutations, observer) {
+            if (apply()) observer.disconnect();
+        }).observe(document, {childList: true, subtree: true});
+    }
+})();
+"""
+# Reads the page's own background (with our stylesheet switched off) and
+# returns its relative luminance; transparent pages render white
+DARK_PAGE_PROBE_JS = """
+(function() {
+    var style = document.getElementById('hixs-dark-mode');
+    if (style) style.disabled = true;
+    var luminance = 1;
+    var elements = [document.body, document.documentElement];
+    for (var i = 0; i < elements.length; i++) {
+        if (!elements[i]) continue;
+        var c = (getComputedStyle(elements[i]).backgroundColor.match(/[0-9.]+/g) || []).map(Number);
+        if (c.length >= 3 && (c.length < 4 || c[3] > 0.5)) {
+            luminance = (0.2126 * c[0] + 0.7152 * c[1] + 0.0722 * c[2]) / 255;
+            break;
+        }
+    }
+    if (style) style.disabled = false;
+    return luminance;
+})();
+"""
+DARK_PAGE_LUMINANCE = 0.3  # pages darker than this are left alone
+
+DARK_MODE_REMOVE_JS = """
+(function() {
+    var style = document.getElementById('hixs-dark-mode');
+    if (style) style.remove();
+})();
+"""
+
+# Window themes; only colors live here, shapes are in THEME_STYLESHEET
+THEMES = {
+    "light": {"window": "#ffffff", "base": "#ffffff", "text": "#202124", "border": "#e0e0e0",
+              "disabled": "#aaaaaa", "accent": "#4285f4"},
+    "dark": {"window": "#2d2d2d", "base": "#1e1e1e", "text": "#e8e8e8", "border": "#4d4d4d",
+             "disabled": "#666666", "accent": "#4285f4"},
+}
+
+# Set once on the main window. It must not name theme colors: Qt resolves stylesheet
+# colors when a widget is polished, so anything theme dependent comes from the palette
+# or from translucent overlays that work on both themes.
+THEME_STYLESHEET = """
+    QToolBar { border: none; padding: 4px; spacing: 4px; }
+    QPushButton {
+        background-color: transparent;
+        border: 1px solid rgba(128, 128, 128, 0.35);
+        border-radius: 4px;
+    }
+    QPushButton:hover { background-color: rgba(128, 128, 128, 0.18); }
+    QPushButton:pressed { background-color: rgba(128, 128, 128, 0.32); }
+    QLineEdit {
+        background-color: rgba(128, 128, 128, 0.12);
+        border: 1px solid rgba(128, 128, 128, 0.35);
+    }
+    QLineEdit:focus { border-color: #4285f4; }
+    QTabWidget::pane { border: 1px solid rgba(128, 128, 128, 0.35); }
+    QTabBar::tab {
+        background-color: rgba(128, 128, 128, 0.12);
+        padding: 8px 16px;
+        margin-right: 2px;
+        border-top-left-radius: 4px;
+        border-top-right-radius: 4px;
+    }
+    QTabBar::tab:selected { background-color: transparent; border-bottom: 2px solid #4285f4; }
+    QTabBar::tab:hover:!selected { background-color: rgba(128, 128, 128, 0.24); }
+    QProgressBar { border: none; background-color: transparent; }
+    QProgressBar::chunk { background-color: #4285f4; }
+"""
+
+# Widgets THEME_STYLESHEET or their own stylesheet draws; Qt keeps the palette
+# they were polished with, so only these are re-polished when the theme changes
+THEMED_WIDGETS = (QToolBar, QPushButton, QLineEdit, QTabWidget, QTabBar, QProgressBar)
+
+# Colors cycled through for new tab groups
+TAB_GROUP_COLORS = ["#4285f4", "#ea4335", "#fbbc04", "#34a853", "#a142f4", "#f439a0", "#24c1e0", "#fa903e"]
+
 # Enhanced ad and tracker blocking patterns (Brave-like) - FIXED: removed duplicates
 AD_BLOCK_PATTERNS = [
     r".*\.doubleclick\.net.*",
@@ -970,9 +1126,16 @@ class DownloadManager(QObject):
         self.browser_window = browser_window
         self.active_downloads = {}
         self.download_counter = 0
-        self.download_dialog = DownloadManagerDialog(browser_window)
+        self._download_dialog = None
         self.downloads_path = self.get_default_download_path()
-        
+    
+    @property
+    def download_dialog(self):
+        """The downloads dialog, built the first time it is needed"""
+        if self._download_dialog is None:
+            self._download_dialog = DownloadManagerDialog(self.browser_window)
+        return self._download_dialog
+    
     def get_default_download_path(self):
         """Get the default downloads folder"""
         downloads_path = QStandardPaths.standardLocations(QStandardPaths.DownloadLocation)
@@ -1090,7 +1253,8 @@ class DownloadManager(QObject):
                     self.browser_window.status_label.setText(f"Download complete: {os.path.basename(file_path)}")
                     
                     # Optional: Show notification
-                    if self.browser_window.settings.value("show_download_notifications", True, type=bool):
+                    if (self.browser_window.tray_icon is not None and
+                            self.browser_window.settings.value("show_download_notifications", True, type=bool)):
                         self.browser_window.tray_icon.showMessage(
                             "Download Complete",
                             f"{os.path.basename(file_path)} has been downloaded.",
@@ -1108,8 +1272,14 @@ class DownloadManager(QObject):
 
 class CustomTabBar(QTabBar):
     """Custom tab bar with close button on each tab and better styling"""
-    def __init__(self, parent=None):
+    group_toggled = pyqtSignal(object)  # TabGroup
+    context_menu_requested = pyqtSignal(int, QPoint)  # index, global pos
+    
+    def __init__(self, registry=None, parent=None):
         super().__init__(parent)
+        self.registry = registry
+        self.group_chips = {}  # TabGroup -> QToolButton header
+        self.group_leaders = {}  # TabGroup -> index of the tab showing the header
         self.setTabsClosable(True)
         self.setMovable(True)
         self.setElideMode(Qt.ElideRight)
@@ -1129,8 +1299,104 @@ class CustomTabBar(QTabBar):
     def tabSizeHint(self, index):
         size = super().tabSizeHint(index)
         if index >= 0:
-            size.setWidth(max(size.width(), 180))
+            group = self.group_at(index)
+            if group is not None and group.collapsed and self.group_leaders.get(group) == index:
+                # Collapsed groups shrink to their colored header
+                chip = self.group_chips.get(group)
+                size.setWidth((chip.sizeHint().width() if chip else 40) + 16)
+            else:
+                size.setWidth(max(size.width(), 180))
         return size
+    
+    def group_at(self, index):
+        """Return the group of the tab at index, if any"""
+        if self.registry is None or not 0 <= index < len(self.registry.order):
+            return None
+        record = self.registry.get(self.registry.order[index])
+        if record is None or not record.groups:
+            return None
+        return next(iter(record.groups))
+    
+    def refresh_groups(self):
+        """Re-attach group headers and apply collapsed state after group changes"""
+        # The first tab of each group carries its header
+        self.group_leaders = {}
+        desired = {}
+        for index in range(self.count()):
+            group = self.group_at(index)
+            leader = group is not None and group not in self.group_leaders
+            if leader:
+                self.group_leaders[group] = index
+                desired[index] = self.group_chip(group)
+            self.setTabVisible(index, group is None or leader or not group.collapsed)
+            close_button = self.tabButton(index, QTabBar.RightSide)
+            if close_button is not None:
+                close_button.setVisible(not (leader and group.collapsed))
+        
+        # Detach headers first so a chip is never owned by two tabs
+        for index in range(self.count()):
+            current = self.tabButton(index, QTabBar.LeftSide)
+            if current is not None and desired.get(index) is not current:
+                self.setTabButton(index, QTabBar.LeftSide, None)
+        for index, chip in desired.items():
+            if self.tabButton(index, QTabBar.LeftSide) is not chip:
+                self.setTabButton(index, QTabBar.LeftSide, chip)
+            chip.show()
+        
+        # Drop headers of groups that no longer have tabs
+        for group in list(self.group_chips):
+            if not group.tab_ids:
+                self.group_chips.pop(group).deleteLater()
+        self.update()
+    
+    def detach_group_header(self, index):
+        """Take a group header off a tab about to be removed; QTabBar deletes tab buttons with their tab"""
+        header = self.tabButton(index, QTabBar.LeftSide)
+        if header is not None and header in self.group_chips.values():
+            self.setTabButton(index, QTabBar.LeftSide, None)
+    
+    def group_chip(self, group):
+        """Return the colored header button for a group"""
+        chip = self.group_chips.get(group)
+        if chip is None:
+            chip = QToolButton(self)
+            chip.setCursor(Qt.PointingHandCursor)
+            chip.setStyleSheet(f"""
+                QToolButton {{
+                    background-color: {group.color};
+                    color: white;
+                    border: none;
+                    border-radius: 8px;
+                    padding: 1px 8px;
+                    font-size: 11px;
+                    font-weight: bold;
+                }}
+            """)
+            chip.clicked.connect(lambda checked=False, g=group: self.group_toggled.emit(g))
+            self.group_chips[group] = chip
+        text = f"{group.name} ({len(group.tab_ids)})" if group.collapsed else group.name
+        chip.setText(text)
+        chip.setToolTip("Click to expand group" if group.collapsed else "Click to collapse group")
+        return chip
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.group_chips:
+            return
+        # Underline grouped tabs with their group color
+        painter = QPainter(self)
+        for index in range(self.count()):
+            group = self.group_at(index)
+            if group is None or not self.isTabVisible(index):
+                continue
+            rect = self.tabRect(index)
+            painter.fillRect(rect.left(), rect.bottom() - 2, rect.width(), 3, QColor(group.color))
+        painter.end()
+    
+    def contextMenuEvent(self, event):
+        index = self.tabAt(event.pos())
+        if index >= 0:
+            self.context_menu_requested.emit(index, event.globalPos())
 
 
 class TabGroup:
@@ -1138,28 +1404,490 @@ class TabGroup:
     def __init__(self, name, color="#4285f4"):
         self.name = name
         self.color = color
-        self.tab_ids = []  # Store unique IDs instead of indices
+        self.tab_ids = set()  # Store unique IDs instead of indices
+        self.collapsed = False
     
     def add_tab(self, tab_id):
-        if tab_id not in self.tab_ids:
-            self.tab_ids.append(tab_id)
+        self.tab_ids.add(tab_id)
     
     def remove_tab(self, tab_id):
-        if tab_id in self.tab_ids:
-            self.tab_ids.remove(tab_id)
+        self.tab_ids.discard(tab_id)
+
+
+class TabRecord:
+    """Registry entry for a single open tab"""
+    __slots__ = ("tab_id", "view", "index", "groups")
+    
+    def __init__(self, tab_id, view, index):
+        self.tab_id = tab_id
+        self.view = view
+        self.index = index
+        self.groups = set()
+
+
+class TabRegistry:
+    """Central tab_id -> view/index/group lookup kept in sync with the tab bar"""
+    def __init__(self):
+        self.records = {}  # tab_id -> TabRecord
+        self.order = []  # tab_ids in tab bar order
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def register(self, view, index):
+        """Register a view that was inserted at index"""
+        record = TabRecord(view.tab_id, view, index)
+        self.records[view.tab_id] = record
+        self.order.insert(index, view.tab_id)
+        # Appending (the common case) leaves every other index untouched
+        self._reindex(index + 1, len(self.order))
+        return record
+    
+    def unregister(self, tab_id):
+        """Forget a tab and drop it from all of its groups"""
+        record = self.records.pop(tab_id, None)
+        if record is None:
+            return None
+        del self.order[record.index]
+        for group in record.groups:
+            group.remove_tab(tab_id)
+        record.groups.clear()
+        self._reindex(record.index, len(self.order))
+        return record
+    
+    def move(self, from_index, to_index):
+        """Mirror a tab bar move; only the indices in between change"""
+        if from_index == to_index:
+            return
+        tab_id = self.order.pop(from_index)
+        self.order.insert(to_index, tab_id)
+        self._reindex(min(from_index, to_index), max(from_index, to_index) + 1)
+    
+    def _reindex(self, start, stop):
+        order = self.order
+        records = self.records
+        for i in range(start, stop):
+            records[order[i]].index = i
+    
+    def get(self, tab_id):
+        return self.records.get(tab_id)
+    
+    def view(self, tab_id):
+        record = self.records.get(tab_id)
+        return record.view if record else None
+    
+    def index_of(self, view):
+        """Return the tab index of a view, or -1 if it is not registered"""
+        record = self.records.get(getattr(view, "tab_id", None))
+        if record is None or record.view is not view:
+            return -1
+        return record.index
+    
+    def add_to_group(self, tab_id, group):
+        record = self.records.get(tab_id)
+        if record is not None:
+            record.groups.add(group)
+            group.add_tab(tab_id)
+    
+    def remove_from_group(self, tab_id, group):
+        record = self.records.get(tab_id)
+        if record is not None:
+            record.groups.discard(group)
+        group.remove_tab(tab_id)
+
+
+class TabSearchIndex:
+    """Incrementally maintained title/URL index for the quick tab switcher"""
+    def __init__(self):
+        self.entries = {}  # tab_id -> (title, url, haystack, charset)
+        self.version = 0
+        self._cache_query = None
+        self._cache_version = -1
+        self._cache_ids = None
+    
+    def update(self, tab_id, title=None, url=None):
+        """Update the indexed title and/or URL of a tab"""
+        old_title, old_url = self.entries.get(tab_id, ("", ""))[:2]
+        title = old_title if title is None else title
+        url = old_url if url is None else url
+        if (title, url) == (old_title, old_url) and tab_id in self.entries:
+            return
+        haystack = f"{title}\n{url}".lower()
+        self.entries[tab_id] = (title, url, haystack, frozenset(haystack))
+        self.version += 1
+    
+    def remove(self, tab_id):
+        if self.entries.pop(tab_id, None) is not None:
+            self.version += 1
+    
+    def search(self, query, limit=50):
+        """Return up to limit (tab_id, title, url) tuples, best match first"""
+        terms = query.lower().split()
+        if not terms:
+            return [(tab_id, entry[0], entry[1]) for tab_id, entry in list(self.entries.items())[:limit]]
+        
+        # While typing, a longer query only narrows the previous result set
+        if (self._cache_ids is not None and self._cache_version == self.version
+                and query.lower().startswith(self._cache_query)):
+            candidates = self._cache_ids
+        else:
+            candidates = self.entries.keys()
+        
+        scored = []
+        matched = []
+        for tab_id in candidates:
+            entry = self.entries[tab_id]
+            score = self._score(terms, entry)
+            if score is not None:
+                matched.append(tab_id)
+                scored.append((score, tab_id))
+        
+        self._cache_query = query.lower()
+        self._cache_version = self.version
+        self._cache_ids = matched
+        
+        scored.sort(key=lambda item: item[0], reverse=True)
+        entries = self.entries
+        return [(tab_id, entries[tab_id][0], entries[tab_id][1]) for _, tab_id in scored[:limit]]
+    
+    @staticmethod
+    def _score(terms, entry):
+        title, url, haystack, charset = entry
+        title_length = len(title)
+        total = 0
+        for term in terms:
+            if not charset.issuperset(term):
+                return None
+            position = haystack.find(term)
+            if position >= 0:
+                # Substring hit: earlier and word-start matches rank higher
+                score = 100 - min(position, 60)
+                if position == 0 or not haystack[position - 1].isalnum():
+                    score += 40
+                if position < title_length:
+                    score += 20
+            else:
+                # Fuzzy subsequence hit: penalize gaps between characters
+                position = haystack.find(term[0])
+                start = position
+                for char in term[1:]:
+                    position = haystack.find(char, position + 1)
+                    if position < 0:
+                        return None
+                score = 40 - min(position - start - len(term), 40)
+            total += score
+        return total
+
+
+class TabSwitcherDialog(QDialog):
+    """Quick switcher popup with fuzzy search over open tabs"""
+    def __init__(self, browser_window, parent=None):
+        super().__init__(parent)
+        self.browser_window = browser_window
+        self.setWindowTitle("Switch to Tab")
+        self.setWindowFlags(Qt.Popup | Qt.FramelessWindowHint)
+        self.setMinimumSize(560, 360)
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+        
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search open tabs by title or URL...")
+        self.search_input.setStyleSheet("padding: 6px 10px; font-size: 14px;")
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.activate_selected)
+        self.search_input.installEventFilter(self)
+        layout.addWidget(self.search_input)
+        
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self.activate_item)
+        layout.addWidget(self.results_list)
+        
+        self.setLayout(layout)
+    
+    def popup(self):
+        """Show the switcher centered over the browser window"""
+        self.search_input.clear()
+        self.update_results("")
+        geometry = self.browser_window.geometry()
+        self.move(geometry.center().x() - self.width() // 2, geometry.top() + 80)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.search_input.setFocus()
+    
+    def update_results(self, text):
+        """Refill the result list for the current query"""
+        results = self.browser_window.tab_search_index.search(text)
+        self.results_list.clear()
+        for tab_id, title, url in results:
+            item = QListWidgetItem(f"{title or 'Untitled'}\n{url}")
+            item.setData(Qt.UserRole, tab_id)
+            self.results_list.addItem(item)
+        if self.results_list.count():
+            self.results_list.setCurrentRow(0)
+    
+    def eventFilter(self, obj, event):
+        # Arrow keys in the search box move the selection
+        if obj is self.search_input and event.type() == QEvent.KeyPress:
+            if event.key() in (Qt.Key_Down, Qt.Key_Up):
+                step = 1 if event.key() == Qt.Key_Down else -1
+                row = self.results_list.currentRow() + step
+                if 0 <= row < self.results_list.count():
+                    self.results_list.setCurrentRow(row)
+                return True
+        return super().eventFilter(obj, event)
+    
+    def activate_selected(self):
+        item = self.results_list.currentItem()
+        if item:
+            self.activate_item(item)
+    
+    def activate_item(self, item):
+        self.browser_window.activate_tab(item.data(Qt.UserRole))
+        self.close()
+
+
+class TabLoadScheduler(QObject):
+    """Defers background tab loads while the foreground tab is loading"""
+    # Let background loads through anyway once the foreground load takes this long
+    FOREGROUND_GRACE_MS = 4000
+    
+    def __init__(self, browser_window, max_concurrent=2):
+        super().__init__()
+        self.browser_window = browser_window
+        self.max_concurrent = max(1, max_concurrent)
+        self.pending = {}  # tab_id -> (view, QUrl), in request order
+        self.active = set()  # tab_ids of background loads in flight
+        self.loading = set()  # tab_ids of all tabs currently loading
+        self.foreground_started = 0.0
+        self.pump_timer = QTimer(self)
+        self.pump_timer.setSingleShot(True)
+        self.pump_timer.timeout.connect(self.pump)
+    
+    def request_load(self, view, qurl):
+        """Queue a background load; it starts as soon as the foreground allows"""
+        self.pending[view.tab_id] = (view, QUrl(qurl))
+        # Never start loads re-entrantly from inside a navigation callback
+        self.schedule_pump(0)
+    
+    def promote(self, view):
+        """Load a pending tab immediately (e.g. because it was activated)"""
+        entry = self.pending.pop(getattr(view, 'tab_id', None), None)
+        if entry:
+            self.start(*entry)
+    
+    def forget(self, tab_id):
+        self.pending.pop(tab_id, None)
+        self.active.discard(tab_id)
+        self.loading.discard(tab_id)
+        self.schedule_pump(0)
+    
+    def is_pending(self, view):
+        return getattr(view, 'tab_id', None) in self.pending
+    
+    def pending_url(self, view):
+        """URL a queued tab will load, or None; the view itself has no URL until it starts"""
+        entry = self.pending.get(getattr(view, 'tab_id', None))
+        return entry[1] if entry else None
+    
+    def set_max_concurrent(self, value):
+        self.max_concurrent = max(1, value)
+        self.schedule_pump(0)
+    
+    def on_load_started(self, view):
+        self.loading.add(view.tab_id)
+        if view is self.browser_window.tabs.currentWidget():
+            self.foreground_started = time.monotonic()
+            self.schedule_pump(self.FOREGROUND_GRACE_MS)
+    
+    def on_load_finished(self, view):
+        self.loading.discard(view.tab_id)
+        self.active.discard(view.tab_id)
+        self.schedule_pump(0)
+    
+    def foreground_wait_ms(self):
+        """Milliseconds background loads should still wait for the visible tab"""
+        current = self.browser_window.tabs.currentWidget()
+        if current is None or current.tab_id not in self.loading:
+            return 0
+        elapsed_ms = (time.monotonic() - self.foreground_started) * 1000
+        return max(0, int(self.FOREGROUND_GRACE_MS - elapsed_ms))
+    
+    def schedule_pump(self, delay_ms):
+        if not self.pending:
+            return
+        if not self.pump_timer.isActive() or self.pump_timer.remainingTime() > delay_ms:
+            self.pump_timer.start(delay_ms)
+    
+    def pump(self):
+        """Start queued loads up to the concurrency cap"""
+        wait_ms = self.foreground_wait_ms()
+        if wait_ms:
+            # on_load_finished pumps earlier if the foreground load completes
+            self.pump_timer.start(wait_ms)
+            return
+        while self.pending and len(self.active) < self.max_concurrent:
+            tab_id = next(iter(self.pending))
+            self.start(*self.pending.pop(tab_id))
+    
+    def start(self, view, qurl):
+        if view is not self.browser_window.tabs.currentWidget():
+            self.active.add(view.tab_id)
+        view.setUrl(qurl)
+
+
+class SpareTabPool(QObject):
+    """Hidden, fully set up tabs with the homepage already loaded, handed out for new tabs"""
+    REFILL_DELAY_MS = 1000  # idle time to wait before building the next spare
+    MAX_AGE = 600  # seconds after which a spare's page is considered stale
+    
+    def __init__(self, browser_window, size=1):
+        super().__init__(browser_window)
+        self.browser_window = browser_window
+        self.size = size
+        self.spares = []  # [(view, url, created, load slot)], oldest first
+        self.load_results = {}  # view -> success of its last finished load
+        self.fill_timer = QTimer(self)
+        self.fill_timer.setSingleShot(True)
+        self.fill_timer.timeout.connect(self.fill)
+    
+    def schedule_fill(self):
+        if len(self.spares) < self.size and not self.fill_timer.isActive():
+            self.fill_timer.start(self.REFILL_DELAY_MS)
+    
+    def fill(self):
+        """Build one spare tab, waiting while any real tab is loading"""
+        window = self.browser_window
+        if window.load_scheduler.loading or window.load_scheduler.pending:
+            self.fill_timer.start(self.REFILL_DELAY_MS)
+            return
+        if len(self.spares) >= self.size:
+            return
+        url = window.get_homepage()
+        view = window.create_tab_view(0)
+        view.hide()
+        on_load = lambda success, v=view: self.load_results.__setitem__(v, success)
+        view.loadFinished.connect(on_load)
+        view.setUrl(QUrl(url))
+        self.spares.append((view, url, time.monotonic(), on_load))
+        self.schedule_fill()
+    
+    def take(self, url):
+        """Return a spare showing url as (view, load result or None), or None if there is none"""
+        now = time.monotonic()
+        found = None
+        for entry in list(self.spares):
+            view, spare_url, created, on_load = entry
+            if now - created > self.MAX_AGE:
+                self.discard(entry)
+            elif found is None and spare_url == url:
+                # The tab's later loads are no business of the pool
+                self.spares.remove(entry)
+                view.loadFinished.disconnect(on_load)
+                found = (view, self.load_results.pop(view, None))
+        self.schedule_fill()
+        return found
+    
+    def discard(self, entry):
+        self.spares.remove(entry)
+        self.load_results.pop(entry[0], None)
+        entry[0].deleteLater()
+    
+    def set_size(self, size):
+        self.size = max(0, size)
+        while len(self.spares) > self.size:
+            self.discard(self.spares[0])
+        self.schedule_fill()
+    
+    def clear(self):
+        self.fill_timer.stop()
+        while self.spares:
+            self.discard(self.spares[0])
+
+
+class IdleInitializer(QObject):
+    """Runs deferred startup work one task per event loop turn once the window has painted"""
+    FALLBACK_MS = 2000  # start anyway if no paint arrives, e.g. while minimized
+    
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.tasks = []  # callables, run in order
+        self.started = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_next)
+        window.installEventFilter(self)
+        QTimer.singleShot(self.FALLBACK_MS, self.start)
+    
+    def add(self, task):
+        self.tasks.append(task)
+        if self.started:
+            self.timer.start(0)
+    
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint:
+            # Let the first frame reach the screen before doing more work
+            QTimer.singleShot(0, self.start)
+        return False
+    
+    def start(self):
+        if not self.started:
+            self.started = True
+            self.window.removeEventFilter(self)
+            self.timer.start(0)
+    
+    def run_next(self):
+        if not self.tasks:
+            return
+        task = self.tasks.pop(0)
+        try:
+            task()
+        except Exception as e:
+            print(f"Idle initialization error: {e}")
+        if self.tasks:
+            self.timer.start(0)
+
+
+class BrowserPage(QWebEnginePage):
+    """Web page that can hand its first navigation to the load scheduler"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.deferred_loader = None  # callable(QUrl) taking over the next main-frame load
+        self.last_navigation_type = None
+    
+    def acceptNavigationRequest(self, url, nav_type, is_main_frame):
+        if is_main_frame:
+            self.last_navigation_type = nav_type
+        if is_main_frame and self.deferred_loader is not None:
+            loader, self.deferred_loader = self.deferred_loader, None
+            loader(url)
+            return False
+        return super().acceptNavigationRequest(url, nav_type, is_main_frame)
 
 
 class BrowserTab(QWebEngineView):
     """Custom browser tab with enhanced features"""
     def __init__(self, tab_id, parent=None):
         super().__init__(parent)
+        self.setPage(BrowserPage(self))
         self.tab_id = tab_id
         self.dark_mode_enabled = False
         self.find_text = ""
         self.find_flags = QWebEnginePage.FindFlags()
+        self.request_count = 0
+        self.blocked_count = 0
+        self.site_settings = None  # SiteSettingsStore consulted for permission requests
         
-        # Enable all modern web features
-        settings = self.settings()
+        # Set up permission handling
+        self.page().featurePermissionRequested.connect(self.handle_permission_request)
+    
+    @staticmethod
+    def configure_profile(profile):
+        """Apply web settings and the user agent once; every page of the profile inherits them"""
+        settings = profile.settings()
         settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
         settings.setAttribute(QWebEngineSettings.PluginsEnabled, True)
         settings.setAttribute(QWebEngineSettings.LocalStorageEnabled, True)
@@ -1180,79 +1908,64 @@ class BrowserTab(QWebEngineView):
         settings.setAttribute(QWebEngineSettings.PlaybackRequiresUserGesture, False)
         settings.setAttribute(QWebEngineSettings.WebRTCPublicInterfacesOnly, False)
         settings.setAttribute(QWebEngineSettings.JavascriptCanPaste, True)
-        
-        # Set up page
-        self.page().profile().setHttpUserAgent(
+        profile.setHttpUserAgent(
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
             "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 HixsBrowser/2.1"
         )
-        
-        # Set up permission handling
-        self.page().featurePermissionRequested.connect(self.handle_permission_request)
-        
-        # Enable developer tools
-        self.settings().setAttribute(QWebEngineSettings.JavascriptEnabled, True)
-        
+    
     def handle_permission_request(self, url, feature):
-        """Handle permission requests"""
-        # Auto-grant common permissions for better UX
-        if feature in [
-            QWebEnginePage.MediaAudioCapture,
-            QWebEnginePage.MediaVideoCapture,
-            QWebEnginePage.MediaAudioVideoCapture,
-            QWebEnginePage.DesktopVideoCapture,
-            QWebEnginePage.DesktopAudioVideoCapture,
-            QWebEnginePage.Notifications,
-            QWebEnginePage.Geolocation
-        ]:
-            self.page().setFeaturePermission(
-                url, feature, QWebEnginePage.PermissionGrantedByUser
-            )
-        else:
-            self.page().setFeaturePermission(
-                url, feature, QWebEnginePage.PermissionDeniedByUser
-            )
+        """Answer a permission request from the stored decision, asking the user if there is none"""
+        name = PERMISSION_FEATURES.get(feature)
+        if name is None or self.site_settings is None:
+            self.page().setFeaturePermission(url, feature, QWebEnginePage.PermissionDeniedByUser)
+            return
+        
+        origin = url_origin(url)
+        decision = self.site_settings.permission(origin, feature)
+        if decision is None:
+            box = QMessageBox(QMessageBox.Question, "Permission Request",
+                              f"{origin} wants to use: {name}", parent=self)
+            allow_btn = box.addButton("Allow", QMessageBox.AcceptRole)
+            box.addButton("Block", QMessageBox.RejectRole)
+            remember = QCheckBox(f"Remember for {PERMISSION_REMEMBER_DAYS} days")
+            remember.setChecked(True)
+            box.setCheckBox(remember)
+            box.exec_()
+            decision = PERMISSION_GRANT if box.clickedButton() is allow_btn else PERMISSION_DENY
+            if remember.isChecked():
+                self.site_settings.set_permission(origin, feature, decision,
+                                                  time.time() + PERMISSION_REMEMBER_DAYS * 86400)
+        
+        self.page().setFeaturePermission(
+            url, feature,
+            QWebEnginePage.PermissionGrantedByUser if decision == PERMISSION_GRANT
+            else QWebEnginePage.PermissionDeniedByUser)
     
-    def set_dark_mode(self, enabled):
-        """Inject or remove dark mode CSS"""
+    def set_dark_mode(self, enabled, script=""):
+        """Restyle the page already loaded with the current dark mode script; new loads get the profile script"""
         self.dark_mode_enabled = enabled
         try:
-            if enabled:
-                js_code = """
-                (function() {
-                    if (document.getElementById('hixs-dark-mode')) return;
-                    var style = document.createElement('style');
-                    style.id = 'hixs-dark-mode';
-                    style.innerHTML = `
-                        html {
-                            filter: invert(1) hue-rotate(180deg) !important;
-                            background-color: #111 !important;
-                        }
-                        img:not([src*=".svg"]), 
-                        video, 
-                        canvas, 
-                        [style*="background-image"] {
-                            filter: invert(1) hue-rotate(180deg) !important;
-                        }
-                        iframe {
-                            filter: invert(1) hue-rotate(180deg) !important;
-                        }
-                    `;
-                    document.head.appendChild(style);
-                })();
-                """
-                self.page().runJavaScript(js_code)
-            else:
-                js_code = """
-                (function() {
-                    var style = document.getElementById('hixs-dark-mode');
-                    if (style) style.remove();
-                })();
-                """
-                self.page().runJavaScript(js_code)
+            self.page().runJavaScript(DARK_MODE_REMOVE_JS + script, QWebEngineScript.ApplicationWorld)
         except Exception as e:
             print(f"Dark mode error: {e}")
     
+    def discard(self):
+        """Release the renderer of a hidden tab; it reloads when shown again"""
+        if self.isVisible():
+            return False
+        try:
+            self.page().setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+            return True
+        except Exception as e:
+            print(f"Discard error: {e}")
+            return False
+    
+    def is_discarded(self):
+        try:
+            return self.page().lifecycleState() == QWebEnginePage.LifecycleState.Discarded
+        except Exception:
+            return False
+    
     def find_in_page(self, text, forward=True):
         """Find text in page"""
         if not text:
@@ -1370,28 +2083,332 @@ class BrowserTab(QWebEngineView):
         """Handle new window requests"""
         main_window = self.window()
         if isinstance(main_window, ModernWebBrowser):
-            return main_window.add_new_tab()
+            if window_type == QWebEnginePage.WebBrowserBackgroundTab:
+                return main_window.create_new_tab()
+            return main_window.add_new_tab("about:blank")
         return None
 
 
 class AdBlockInterceptor(QWebEngineUrlRequestInterceptor):
-    """Intercepts and blocks ads and trackers"""
-    def __init__(self, browser_window):
-        super().__init__()
+    """Intercepts and blocks ads and trackers, counting requests per tab"""
+    def __init__(self, browser_window, view=None, blocking=True):
+        super().__init__(view)
         self.browser_window = browser_window
+        self.view = view
+        self.blocking = blocking
     
     def interceptRequest(self, info):
         try:
+            if self.view is not None:
+                self.view.request_count += 1
+            if not self.blocking:
+                return
             url = info.requestUrl().toString()
             for pattern in COMPILED_PATTERNS:
                 if pattern.search(url):
                     info.block(True)
+                    if self.view is not None:
+                        self.view.blocked_count += 1
                     self.browser_window.increment_tracker_count()
                     return
         except Exception as e:
             print(f"AdBlock error: {e}")
 
 
+class ProcessSampler:
+    """Samples resident memory and CPU usage of processes from /proc"""
+    def __init__(self):
+        self.available = os.path.isdir("/proc/self")
+        try:
+            self.page_size = os.sysconf("SC_PAGE_SIZE")
+            self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        except (AttributeError, ValueError, OSError):
+            self.available = False
+        self.last_cpu = {}  # pid -> (cpu_seconds, wall_time)
+    
+    def memory_mb(self, pid):
+        """Resident set size in MB, or None if unavailable"""
+        if not self.available or not pid:
+            return None
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * self.page_size / (1024 * 1024)
+        except (OSError, ValueError, IndexError):
+            return None
+    
+    def cpu_percent(self, pid):
+        """CPU usage since the previous sample, or None on the first sample"""
+        if not self.available or not pid:
+            return None
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the parenthesized command name; utime/stime are 14/15
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu_seconds = (int(fields[11]) + int(fields[12])) / self.clock_ticks
+        except (OSError, ValueError, IndexError):
+            return None
+        now = time.monotonic()
+        previous = self.last_cpu.get(pid)
+        self.last_cpu[pid] = (cpu_seconds, now)
+        if previous is None or now <= previous[1]:
+            return None
+        return max(0.0, (cpu_seconds - previous[0]) / (now - previous[1]) * 100)
+    
+    def forget_missing(self, live_pids):
+        for pid in list(self.last_cpu):
+            if pid not in live_pids:
+                del self.last_cpu[pid]
+
+
+class StartupProfiler(QObject):
+    """Records startup phase timestamps and writes a JSON report (--profile-startup[=path])"""
+    TIMEOUT_MS = 30000  # report whatever was reached if startup never settles
+    
+    def __init__(self, report_path=None, budget_ms=None):
+        super().__init__()
+        self.report_path = report_path  # None when profiling is off, "" for the default file
+        self.budget_ms = budget_ms
+        self.marks = [("process_start", 0.0)]  # [(phase, ms since STARTUP_TIME)] in order
+        self.events = {}  # one-off milestones such as first_paint -> ms
+        self.window = None
+        self.reported = False
+    
+    @classmethod
+    def from_argv(cls, argv):
+        """Remove --profile-startup[=path] and --startup-budget=MS from argv and build a profiler"""
+        report_path = None
+        budget_ms = None
+        for arg in list(argv[1:]):
+            if arg == "--profile-startup" or arg.startswith("--profile-startup="):
+                # The default lives under the app data folder, which is only known once
+                # QApplication and its names exist, so it is resolved in write_report
+                report_path = arg.partition("=")[2]
+                argv.remove(arg)
+            elif arg.startswith("--startup-budget="):
+                try:
+                    budget_ms = float(arg.partition("=")[2])
+                except ValueError:
+                    print(f"Ignoring invalid startup budget: {arg}")
+                argv.remove(arg)
+        return cls(report_path, budget_ms)
+    
+    @property
+    def active(self):
+        return self.report_path is not None
+    
+    @staticmethod
+    def elapsed_ms():
+        return (time.perf_counter() - STARTUP_TIME) * 1000
+    
+    def mark(self, phase):
+        """Record the end of a startup phase"""
+        if self.active:
+            self.marks.append((phase, self.elapsed_ms()))
+    
+    def milestone(self, name):
+        """Record the first occurrence of a milestone and report once startup has settled"""
+        if self.active and name not in self.events:
+            self.events[name] = self.elapsed_ms()
+            if {"first_paint", "first_load", "session_restored"} <= self.events.keys():
+                self.write_report()
+    
+    def watch(self, window):
+        """Catch the first paint of the main window"""
+        if self.active:
+            self.window = window
+            window.installEventFilter(self)
+            QTimer.singleShot(self.TIMEOUT_MS, self.write_report)
+    
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.milestone("first_paint")
+        return False
+    
+    def report(self):
+        phases = []
+        for (_, start), (phase, end) in zip(self.marks, self.marks[1:]):
+            phases.append({"phase": phase, "start_ms": round(start, 1), "duration_ms": round(end - start, 1)})
+        total_ms = max([self.marks[-1][1]] + list(self.events.values()))
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "phases": phases,
+            "events": {name: round(ms, 1) for name, ms in self.events.items()},
+            "total_ms": round(total_ms, 1),
+            "rss_mb": ProcessSampler().memory_mb(os.getpid()),
+        }
+        if self.budget_ms is not None:
+            # The first load is what the user waits for; fall back to the last thing reached
+            measured = self.events.get("first_load", total_ms)
+            report["budget_ms"] = self.budget_ms
+            report["within_budget"] = measured <= self.budget_ms
+        return report
+    
+    def write_report(self):
+        if not self.active or self.reported:
+            return
+        self.reported = True
+        if not self.report_path:
+            self.report_path = app_data_path("startup_profile.json")
+        report = self.report()
+        try:
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            print(f"Startup profile error: {e}")
+        print("Startup profile:")
+        for phase in report["phases"]:
+            print(f"  {phase['phase']:<20} {phase['duration_ms']:>8.1f} ms")
+        for name, ms in report["events"].items():
+            print(f"  {name:<20} at {ms:>5.1f} ms")
+        if "within_budget" in report:
+            verdict = "within" if report["within_budget"] else "OVER"
+            print(f"  {verdict} budget of {self.budget_ms:.0f} ms")
+        print(f"  report written to {self.report_path}")
+
+
+class TaskManagerDialog(QDialog):
+    """Task manager listing per-tab renderer resources"""
+    COLUMNS = ["Tab", "PID", "Memory (MB)", "CPU %", "Requests", "Blocked"]
+    SAMPLE_INTERVAL_MS = 2000
+    
+    def __init__(self, browser_window, parent=None):
+        super().__init__(parent)
+        self.browser_window = browser_window
+        self.sampler = ProcessSampler()
+        self.items = {}  # tab_id -> QTreeWidgetItem
+        self.setWindowTitle("Task Manager")
+        self.setMinimumSize(760, 420)
+        
+        layout = QVBoxLayout()
+        
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(len(self.COLUMNS))
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tree.setSortingEnabled(True)
+        self.tree.sortByColumn(2, Qt.DescendingOrder)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.tree)
+        
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+        if not self.sampler.available:
+            self.summary_label.setText("Process statistics are only available on Linux (/proc)")
+        
+        button_layout = QHBoxLayout()
+        discard_btn = QPushButton("Discard")
+        discard_btn.setToolTip("Release the renderer memory of the selected background tabs")
+        discard_btn.clicked.connect(self.discard_selected)
+        button_layout.addWidget(discard_btn)
+        
+        reload_btn = QPushButton("Reload")
+        reload_btn.clicked.connect(self.reload_selected)
+        button_layout.addWidget(reload_btn)
+        
+        button_layout.addStretch()
+        
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start(self.SAMPLE_INTERVAL_MS)
+    
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+    
+    def refresh(self):
+        """Sample every tab and update the rows in place"""
+        try:
+            records = self.browser_window.tab_registry.records
+            pids = {}
+            pid_tabs = {}
+            for tab_id, record in records.items():
+                pid = record.view.page().renderProcessPid()
+                pids[tab_id] = pid
+                pid_tabs[pid] = pid_tabs.get(pid, 0) + 1
+            shared = {pid for pid, count in pid_tabs.items() if pid and count > 1}
+            
+            # Sample each renderer once even if several tabs share it
+            samples = {}
+            for pid in set(pids.values()):
+                samples[pid] = (self.sampler.memory_mb(pid), self.sampler.cpu_percent(pid))
+            self.sampler.forget_missing(samples)
+            
+            self.tree.setSortingEnabled(False)
+            for tab_id in list(self.items):
+                if tab_id not in records:
+                    item = self.items.pop(tab_id)
+                    self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(item))
+            
+            total_memory = 0.0
+            for tab_id, record in records.items():
+                view = record.view
+                pid = pids[tab_id]
+                memory, cpu = samples.get(pid, (None, None))
+                item = self.items.get(tab_id)
+                if item is None:
+                    item = QTreeWidgetItem()
+                    item.setData(0, Qt.UserRole, tab_id)
+                    self.tree.addTopLevelItem(item)
+                    self.items[tab_id] = item
+                
+                title = view.title() or view.url().toString() or "New Tab"
+                item.setText(0, title)
+                item.setToolTip(0, view.url().toString())
+                if pid:
+                    item.setData(1, Qt.DisplayRole, f"{pid} (shared)" if pid in shared else str(pid))
+                else:
+                    item.setData(1, Qt.DisplayRole, "suspended" if view.is_discarded() else "-")
+                item.setData(2, Qt.DisplayRole, round(memory, 1) if memory is not None else 0.0)
+                item.setData(3, Qt.DisplayRole, round(cpu, 1) if cpu is not None else 0.0)
+                item.setData(4, Qt.DisplayRole, view.request_count)
+                item.setData(5, Qt.DisplayRole, view.blocked_count)
+                if memory is not None and pid not in shared:
+                    total_memory += memory
+            self.tree.setSortingEnabled(True)
+            
+            if self.sampler.available:
+                browser_memory = self.sampler.memory_mb(os.getpid()) or 0.0
+                self.summary_label.setText(
+                    f"{len(records)} tabs - renderers {total_memory:.0f} MB (excluding shared) - "
+                    f"browser process {browser_memory:.0f} MB"
+                )
+        except Exception as e:
+            print(f"Task manager error: {e}")
+    
+    def selected_views(self):
+        views = []
+        for item in self.tree.selectedItems():
+            view = self.browser_window.tab_registry.view(item.data(0, Qt.UserRole))
+            if view is not None:
+                views.append(view)
+        return views
+    
+    def discard_selected(self):
+        """Discard the selected tabs (the visible tab cannot be discarded)"""
+        discarded = sum(1 for view in self.selected_views() if view.discard())
+        self.summary_label.setText(f"Discarded {discarded} tab(s)")
+        self.refresh()
+    
+    def reload_selected(self):
+        for view in self.selected_views():
+            view.reload()
+        self.refresh()
+
+
 class FindDialog(QDialog):
     """Find in page dialog"""
     def __init__(self, browser, parent=None):
@@ -1439,55 +2456,2397 @@ class FindDialog(QDialog):
         super().closeEvent(event)
 
 
-class ModernWebBrowser(QMainWindow):
-    """Main browser window with all features"""
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Hixs Browser")
-        self.setGeometry(100, 100, 1400, 900)
-        
-        # Initialize settings
-        self.settings = QSettings("HixsBrowser", "HixsBrowser")
-        self.current_search_engine = self.settings.value("search_engine", "Google")
-        self.dark_mode = self.settings.value("dark_mode", False, type=bool)
-        self.ad_block_enabled = self.settings.value("ad_block_enabled", True, type=bool)
-        self.force_dark_website = self.settings.value("force_dark_website", False, type=bool)
-        self.tracker_count = 0
-        self.tab_groups = []
-        self.tab_counter = 0
-        self.find_dialog = None
+# History transition types stored with each visit
+TRANSITION_LINK = 0
+TRANSITION_TYPED = 1
+TRANSITION_FORM = 2
+TRANSITION_BACK_FORWARD = 3
+TRANSITION_RELOAD = 4
+TRANSITION_REDIRECT = 5
+TRANSITION_OTHER = 6
+
+NAVIGATION_TRANSITIONS = {
+    QWebEnginePage.NavigationTypeLinkClicked: TRANSITION_LINK,
+    QWebEnginePage.NavigationTypeTyped: TRANSITION_TYPED,
+    QWebEnginePage.NavigationTypeFormSubmitted: TRANSITION_FORM,
+    QWebEnginePage.NavigationTypeBackForward: TRANSITION_BACK_FORWARD,
+    QWebEnginePage.NavigationTypeReload: TRANSITION_RELOAD,
+    QWebEnginePage.NavigationTypeRedirect: TRANSITION_REDIRECT,
+}
+
+# Only these schemes are recorded in history
+HISTORY_SCHEMES = ("http", "https", "file", "ftp")
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version
+HISTORY_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS urls (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL DEFAULT '',
+        visit_count INTEGER NOT NULL DEFAULT 0,
+        typed_count INTEGER NOT NULL DEFAULT 0,
+        last_visit REAL NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS visits (
+        id INTEGER PRIMARY KEY,
+        url_id INTEGER NOT NULL,
+        visit_time REAL NOT NULL,
+        transition INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS urls_last_visit ON urls(last_visit);
+    CREATE INDEX IF NOT EXISTS visits_time ON visits(visit_time);
+    CREATE INDEX IF NOT EXISTS visits_url ON visits(url_id, visit_time);
+    """,
+    """
+    ALTER TABLE urls ADD COLUMN frecency REAL NOT NULL DEFAULT 0;
+    ALTER TABLE urls ADD COLUMN frecency_dirty INTEGER NOT NULL DEFAULT 1;
+    ALTER TABLE urls ADD COLUMN frecency_expires REAL;
+    CREATE INDEX IF NOT EXISTS urls_frecency ON urls(frecency);
+    CREATE INDEX IF NOT EXISTS urls_frecency_dirty ON urls(frecency_dirty) WHERE frecency_dirty = 1;
+    CREATE INDEX IF NOT EXISTS urls_frecency_expires ON urls(frecency_expires) WHERE frecency_expires IS NOT NULL;
+    """,
+]
+
+# Frecency: visit count times the average weight of the most recent visits.
+# A visit's weight decays in steps as it ages through these (days, weight)
+# buckets, and is scaled by a per-transition bonus in percent.
+FRECENCY_BUCKETS = [(4, 100), (14, 70), (31, 50), (90, 30)]
+FRECENCY_OLD_WEIGHT = 10
+FRECENCY_SAMPLE_SIZE = 10
+FRECENCY_TRANSITION_BONUS = {
+    TRANSITION_LINK: 100,
+    TRANSITION_TYPED: 200,
+    TRANSITION_FORM: 100,
+    TRANSITION_BACK_FORWARD: 50,
+    TRANSITION_RELOAD: 0,
+    TRANSITION_REDIRECT: 25,
+    TRANSITION_OTHER: 80,
+}
+
+# Full-text index over urls; skipped if SQLite was built without FTS5
+HISTORY_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS urls_fts USING fts5(
+        title, url, content='urls', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS urls_fts_insert AFTER INSERT ON urls BEGIN
+        INSERT INTO urls_fts(rowid, title, url) VALUES (new.id, new.title, new.url);
+    END;
+    CREATE TRIGGER IF NOT EXISTS urls_fts_delete AFTER DELETE ON urls BEGIN
+        INSERT INTO urls_fts(urls_fts, rowid, title, url) VALUES ('delete', old.id, old.title, old.url);
+    END;
+    CREATE TRIGGER IF NOT EXISTS urls_fts_update AFTER UPDATE OF title, url ON urls BEGIN
+        INSERT INTO urls_fts(urls_fts, rowid, title, url) VALUES ('delete', old.id, old.title, old.url);
+        INSERT INTO urls_fts(rowid, title, url) VALUES (new.id, new.title, new.url);
+    END;
+"""
+
+
+BOOKMARK_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS folders (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        parent_id INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (parent_id, name)
+    );
+    CREATE TABLE IF NOT EXISTS bookmarks (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL DEFAULT '',
+        folder_id INTEGER NOT NULL DEFAULT 0,
+        created REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS bookmarks_folder ON bookmarks(folder_id, id);
+    CREATE TABLE IF NOT EXISTS bookmark_tags (
+        tag TEXT NOT NULL,
+        bookmark_id INTEGER NOT NULL,
+        PRIMARY KEY (tag, bookmark_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS bookmark_tags_bookmark ON bookmark_tags(bookmark_id);
+    """,
+]
+
+DEFAULT_BOOKMARK_FOLDER = "Unsorted"
+
+SITE_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS site_zoom (
+        host TEXT PRIMARY KEY,
+        zoom REAL NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS site_permissions (
+        origin TEXT NOT NULL,
+        feature INTEGER NOT NULL,
+        decision INTEGER NOT NULL,
+        expires REAL,
+        PRIMARY KEY (origin, feature)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS site_dark_mode (
+        host TEXT PRIMARY KEY,
+        mode TEXT NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS site_dark_probe (
+        host TEXT PRIMARY KEY,
+        is_dark INTEGER NOT NULL,
+        probed REAL NOT NULL
+    ) WITHOUT ROWID;
+    """,
+]
+
+PERMISSION_ASK = 0
+PERMISSION_GRANT = 1
+PERMISSION_DENY = 2
+PERMISSION_DECISION_NAMES = {PERMISSION_ASK: "Ask", PERMISSION_GRANT: "Allow", PERMISSION_DENY: "Block"}
+PERMISSION_REMEMBER_DAYS = 30  # how long an answer to a prompt is remembered
+
+PERMISSION_FEATURES = {
+    QWebEnginePage.Geolocation: "Location",
+    QWebEnginePage.MediaAudioCapture: "Microphone",
+    QWebEnginePage.MediaVideoCapture: "Camera",
+    QWebEnginePage.MediaAudioVideoCapture: "Camera and microphone",
+    QWebEnginePage.DesktopVideoCapture: "Screen sharing",
+    QWebEnginePage.DesktopAudioVideoCapture: "Screen and audio sharing",
+    QWebEnginePage.Notifications: "Notifications",
+    QWebEnginePage.MouseLock: "Mouse lock",
+}
+
+
+def url_origin(qurl):
+    """scheme://host[:port] of a QUrl"""
+    port = qurl.port()
+    return f"{qurl.scheme()}://{qurl.host()}" + (f":{port}" if port != -1 else "")
+
+
+def app_data_path(filename):
+    """Return a path inside the per-user application data directory"""
+    base = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".hixsbrowser")
+    os.makedirs(base, exist_ok=True)
+    return os.path.join(base, filename)
+
+
+def visit_weight(visit_time, transition, now):
+    """Return (weight, time the weight next drops or None) for a single visit"""
+    age_days = (now - visit_time) / 86400
+    bonus = FRECENCY_TRANSITION_BONUS.get(transition, 100) / 100
+    for days, weight in FRECENCY_BUCKETS:
+        if age_days < days:
+            return weight * bonus, visit_time + days * 86400
+    return FRECENCY_OLD_WEIGHT * bonus, None
+
+
+def frecency_score(visit_count, visits, now):
+    """Return (frecency, expiry) from a sample of (visit_time, transition) rows"""
+    if not visits:
+        return 0.0, None
+    total = 0.0
+    expires = None
+    for visit_time, transition in visits:
+        weight, drops_at = visit_weight(visit_time, transition, now)
+        total += weight
+        if drops_at is not None and (expires is None or drops_at < expires):
+            expires = drops_at
+    return visit_count * total / len(visits), expires
+
+
+def open_database(path, migrations):
+    """Open a SQLite database in WAL mode and apply pending schema migrations"""
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for index in range(version, len(migrations)):
+        with conn:
+            conn.executescript(migrations[index])
+            conn.execute(f"PRAGMA user_version = {index + 1}")
+    return conn
+
+
+def theme_palette(colors):
+    """Compile a THEMES entry into a QPalette"""
+    palette = QPalette()
+    for role in (QPalette.Window, QPalette.Button, QPalette.AlternateBase, QPalette.ToolTipBase):
+        palette.setColor(role, QColor(colors["window"]))
+    palette.setColor(QPalette.Base, QColor(colors["base"]))
+    for role in (QPalette.WindowText, QPalette.Text, QPalette.ButtonText, QPalette.ToolTipText):
+        palette.setColor(role, QColor(colors["text"]))
+    for role in (QPalette.Mid, QPalette.Dark, QPalette.Midlight):
+        palette.setColor(role, QColor(colors["border"]))
+    palette.setColor(QPalette.Highlight, QColor(colors["accent"]))
+    palette.setColor(QPalette.HighlightedText, QColor("#ffffff"))
+    palette.setColor(QPalette.Link, QColor(colors["accent"]))
+    for role in (QPalette.WindowText, QPalette.Text, QPalette.ButtonText):
+        palette.setColor(QPalette.Disabled, role, QColor(colors["disabled"]))
+    return palette
+
+
+def data_version(conn):
+    """Token that changes whenever any connection commits to the database"""
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+def open_history_db(path):
+    """Open the history database and make sure its full-text index exists"""
+    conn = open_database(path, HISTORY_MIGRATIONS)
+    try:
+        conn.executescript(HISTORY_FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        print(f"History full-text search unavailable: {e}")
+    return conn
+
+
+class HistoryWriter(QThread):
+    """Owns the history write connection and commits queued work in batches"""
+    frecency_updated = pyqtSignal(list)  # [(url, frecency)]
+    urls_expired = pyqtSignal(int)
+    
+    BATCH_SIZE = 500
+    BATCH_WAIT = 0.05  # seconds to gather a burst into one transaction
+    IDLE_INTERVAL = 2.0  # seconds without work before idle tasks run
+    FRECENCY_BATCH = 500
+    EXPIRE_BATCH = 1000
+    EXPIRE_INTERVAL = 3600  # seconds between retention passes
+    COMPACT_DELAY = 600  # seconds after startup before the first compaction check
+    COMPACT_INTERVAL = 86400
+    COMPACT_FREE_RATIO = 0.2  # VACUUM once this share of pages is free
+    
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.queue = queue.Queue()
+        # Callables(conn) run when the queue is quiet; returning True asks
+        # to be run again as long as nothing else is waiting
+        self.idle_tasks = [self.update_frecency, self.expire_history, self.compact]
+        
+        # Retention limits; 0 keeps history forever
+        self.max_age_days = 0
+        self.max_visits = 0
+        self.expire_cutoff = None  # visit time being expired up to, while a pass runs
+        self.next_expire = 0
+        self.next_compact = time.time() + self.COMPACT_DELAY
+        self.writes_since_optimize = 0
+    
+    def submit(self, op, *args):
+        self.queue.put((op, args))
+    
+    def stop(self):
+        self.queue.put(None)
+    
+    def run(self):
+        try:
+            conn = open_history_db(self.path)
+        except sqlite3.Error as e:
+            print(f"History writer error: {e}")
+            return
         
-        # Check privacy policy agreement on first launch
+        running = True
+        while running:
+            try:
+                item = self.queue.get(timeout=self.IDLE_INTERVAL)
+            except queue.Empty:
+                self.run_idle_tasks(conn)
+                continue
+            
+            # Gather everything that arrives in a short burst
+            batch = [item]
+            deadline = time.monotonic() + self.BATCH_WAIT
+            while item is not None and len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            self.write_batch(conn, batch)
+        conn.close()
+    
+    def write_batch(self, conn, batch):
+        try:
+            with conn:
+                for op, args in batch:
+                    getattr(self, f"op_{op}")(conn, *args)
+            self.writes_since_optimize += len(batch)
+        except sqlite3.Error as e:
+            print(f"History write error: {e}")
+    
+    def run_idle_tasks(self, conn):
+        pending = list(self.idle_tasks)
+        while pending and self.queue.empty():
+            task = pending.pop(0)
+            try:
+                if task(conn):
+                    pending.append(task)
+            except sqlite3.Error as e:
+                print(f"History maintenance error: {e}")
+    
+    def update_frecency(self, conn):
+        """Recompute frecency for rows that were visited or whose weights decayed"""
+        now = time.time()
+        rows = conn.execute("""
+            SELECT id, url, visit_count FROM urls WHERE frecency_dirty = 1
+            UNION
+            SELECT id, url, visit_count FROM urls WHERE frecency_expires IS NOT NULL AND frecency_expires <= ?
+            LIMIT ?
+        """, (now, self.FRECENCY_BATCH)).fetchall()
+        if not rows:
+            return False
+        
+        updates = []
+        changed = []
+        for url_id, url, visit_count in rows:
+            visits = conn.execute(
+                "SELECT visit_time, transition FROM visits WHERE url_id = ? ORDER BY visit_time DESC LIMIT ?",
+                (url_id, FRECENCY_SAMPLE_SIZE)).fetchall()
+            frecency, expires = frecency_score(visit_count, visits, now)
+            updates.append((frecency, expires, url_id))
+            changed.append((url, frecency))
+        with conn:
+            conn.executemany(
+                "UPDATE urls SET frecency = ?, frecency_expires = ?, frecency_dirty = 0 WHERE id = ?", updates)
+        self.frecency_updated.emit(changed)
+        return len(rows) == self.FRECENCY_BATCH
+    
+    def expire_history(self, conn):
+        """Delete visits and URLs beyond the retention limits, one small batch per call"""
+        if self.expire_cutoff is None:
+            now = time.time()
+            if now < self.next_expire:
+                return False
+            self.next_expire = now + self.EXPIRE_INTERVAL
+            cutoff = now - self.max_age_days * 86400 if self.max_age_days else 0
+            if self.max_visits:
+                row = conn.execute("SELECT visit_time FROM visits ORDER BY visit_time DESC LIMIT 1 OFFSET ?",
+                                   (self.max_visits,)).fetchone()
+                if row:
+                    cutoff = max(cutoff, row[0])
+            if not cutoff:
+                return False
+            self.expire_cutoff = cutoff
+            self.expire_started = time.perf_counter()
+            self.expired_visits = 0
+            self.expired_urls = 0
+        
+        # Visits first; URLs left without visits once those are gone
+        batch = conn.execute("SELECT id, url_id FROM visits WHERE visit_time <= ? ORDER BY visit_time LIMIT ?",
+                             (self.expire_cutoff, self.EXPIRE_BATCH)).fetchall()
+        expired_per_url = {}
+        for _, url_id in batch:
+            expired_per_url[url_id] = expired_per_url.get(url_id, 0) + 1
+        with conn:
+            # The URLs' counts and frecency must not outlive the visits they came from
+            conn.executemany(
+                "UPDATE urls SET visit_count = max(visit_count - ?, 0), frecency_dirty = 1 WHERE id = ?",
+                [(count, url_id) for url_id, count in expired_per_url.items()])
+            deleted = conn.executemany(
+                "DELETE FROM visits WHERE id = ?", [(visit_id,) for visit_id, _ in batch]).rowcount
+            self.expired_visits += deleted
+            if deleted < self.EXPIRE_BATCH:
+                deleted = conn.execute("""
+                    DELETE FROM urls WHERE id IN (
+                        SELECT id FROM urls WHERE last_visit <= ?
+                        AND NOT EXISTS (SELECT 1 FROM visits WHERE url_id = urls.id) LIMIT ?)
+                """, (self.expire_cutoff, self.EXPIRE_BATCH)).rowcount
+                self.expired_urls += deleted
+        self.writes_since_optimize += deleted
+        if deleted == self.EXPIRE_BATCH:
+            return True
+        
+        if self.expired_visits or self.expired_urls:
+            print(f"History expiry: removed {self.expired_visits} visits and {self.expired_urls} URLs "
+                  f"in {time.perf_counter() - self.expire_started:.2f}s")
+        if self.expired_urls:
+            self.urls_expired.emit(self.expired_urls)
+        self.expire_cutoff = None
+        return False
+    
+    def compact(self, conn):
+        """Merge full-text index segments and VACUUM once enough space is free"""
+        now = time.time()
+        if now < self.next_compact or self.expire_cutoff is not None:
+            return False
+        self.next_compact = now + self.COMPACT_INTERVAL
+        
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'urls_fts'").fetchone()
+        if has_fts and self.writes_since_optimize:
+            started = time.perf_counter()
+            with conn:
+                conn.execute("INSERT INTO urls_fts(urls_fts) VALUES ('optimize')")
+            self.writes_since_optimize = 0
+            print(f"History maintenance: FTS optimize took {time.perf_counter() - started:.2f}s")
+        
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_pages / page_count >= self.COMPACT_FREE_RATIO:
+            started = time.perf_counter()
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            print(f"History maintenance: VACUUM reclaimed {free_pages} of {page_count} pages "
+                  f"in {time.perf_counter() - started:.2f}s")
+        return False
+    
+    def op_visit(self, conn, url, title, visit_time, transition):
+        typed = 1 if transition == TRANSITION_TYPED else 0
+        conn.execute("""
+            INSERT INTO urls (url, title, visit_count, typed_count, last_visit)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                visit_count = visit_count + 1,
+                typed_count = typed_count + excluded.typed_count,
+                last_visit = max(last_visit, excluded.last_visit),
+                frecency_dirty = 1,
+                title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END
+        """, (url, title, typed, visit_time))
+        url_id = conn.execute("SELECT id FROM urls WHERE url = ?", (url,)).fetchone()[0]
+        conn.execute("INSERT INTO visits (url_id, visit_time, transition) VALUES (?, ?, ?)",
+                     (url_id, visit_time, transition))
+    
+    def op_title(self, conn, url, title):
+        conn.execute("UPDATE urls SET title = ? WHERE url = ? AND title != ?", (title, url, title))
+    
+    def op_clear(self, conn):
+        conn.execute("DELETE FROM visits")
+        conn.execute("DELETE FROM urls")
+    
+    def op_call(self, conn, func):
+        func(conn)
+
+
+class HistoryStore:
+    """SQLite-backed browsing history with batched background writes"""
+    def __init__(self, path):
+        self.path = path
+        self.db = open_history_db(path)
+        self.has_fts = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'urls_fts'").fetchone() is not None
+        self.writer = HistoryWriter(path)
+        self.writer.start()
+    
+    def record_visit(self, url, title="", transition=TRANSITION_LINK, visit_time=None):
+        """Queue a committed navigation for recording"""
+        if not url or QUrl(url).scheme() not in HISTORY_SCHEMES:
+            return False
+        self.writer.submit("visit", url, title or "", visit_time or time.time(), transition)
+        return True
+    
+    def update_title(self, url, title):
+        if url and title and QUrl(url).scheme() in HISTORY_SCHEMES:
+            self.writer.submit("title", url, title)
+    
+    def clear(self):
+        self.writer.submit("clear")
+    
+    def set_retention(self, max_age_days, max_visits):
+        """Limit history by age and visit count; 0 disables a limit"""
+        self.writer.max_age_days = max_age_days
+        self.writer.max_visits = max_visits
+        self.writer.next_expire = 0
+    
+    def top_sites(self, limit=8):
+        """Highest-frecency URLs as (url, title) pairs"""
+        return self.db.execute(
+            "SELECT url, title FROM urls WHERE frecency > 0 ORDER BY frecency DESC LIMIT ?", (limit,)
+        ).fetchall()
+    
+    def recent(self, limit=10):
+        """Most recently visited URLs as (url, title) pairs"""
+        return self.db.execute(
+            "SELECT url, title FROM urls ORDER BY last_visit DESC LIMIT ?", (limit,)
+        ).fetchall()
+    
+    def page(self, query="", cursor=None, limit=200):
+        """Return (rows, next_cursor); rows are (url, title, last_visit, visit_count)"""
+        query = query.strip()
+        if not query:
+            # Keyset pagination on (last_visit, id) keeps deep pages cheap
+            if cursor is None:
+                rows = self.db.execute("""
+                    SELECT id, url, title, last_visit, visit_count FROM urls
+                    ORDER BY last_visit DESC, id DESC LIMIT ?
+                """, (limit,)).fetchall()
+            else:
+                rows = self.db.execute("""
+                    SELECT id, url, title, last_visit, visit_count FROM urls
+                    WHERE (last_visit, id) < (?, ?)
+                    ORDER BY last_visit DESC, id DESC LIMIT ?
+                """, (cursor[0], cursor[1], limit)).fetchall()
+            next_cursor = (rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+            return [row[1:] for row in rows], next_cursor
+        
+        offset = cursor or 0
+        if self.has_fts:
+            # Every word must match as a prefix of the title or URL
+            match = " ".join('"' + term.replace('"', '""') + '"*' for term in query.split())
+            rows = self.db.execute("""
+                SELECT u.url, u.title, u.last_visit, u.visit_count
+                FROM urls_fts JOIN urls u ON u.id = urls_fts.rowid
+                WHERE urls_fts MATCH ?
+                ORDER BY u.last_visit DESC LIMIT ? OFFSET ?
+            """, (match, limit, offset)).fetchall()
+        else:
+            pattern = f"%{query}%"
+            rows = self.db.execute("""
+                SELECT url, title, last_visit, visit_count FROM urls
+                WHERE title LIKE ? OR url LIKE ?
+                ORDER BY last_visit DESC LIMIT ? OFFSET ?
+            """, (pattern, pattern, limit, offset)).fetchall()
+        return rows, (offset + limit if len(rows) == limit else None)
+    
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        self.writer.stop()
+        self.writer.wait(5000)
+        self.db.close()
+
+
+class BookmarkStore:
+    """Indexed bookmark store with folders, tags and one entry per URL"""
+    def __init__(self, path):
+        self.path = path
+        self.db = open_database(path, BOOKMARK_MIGRATIONS)
+        self.folder_ids = {}  # (parent_id, name) -> id
+        self.load_folders()
+    
+    def load_folders(self):
+        """Refresh the folder cache, e.g. after another connection added folders"""
+        self.folder_ids = {}
+        for folder_id, name, parent_id in self.db.execute("SELECT id, name, parent_id FROM folders"):
+            self.folder_ids[(parent_id, name)] = folder_id
+    
+    def folder_id(self, name, parent_id=0):
+        """Return the id of a folder, creating it if needed"""
+        key = (parent_id, name)
+        if key not in self.folder_ids:
+            with self.db:
+                cursor = self.db.execute("INSERT INTO folders (name, parent_id) VALUES (?, ?)", (name, parent_id))
+            self.folder_ids[key] = cursor.lastrowid
+        return self.folder_ids[key]
+    
+    def folders(self):
+        """All folders as (id, name) pairs"""
+        return self.db.execute("SELECT id, name FROM folders ORDER BY name").fetchall()
+    
+    def add(self, url, title, folder=DEFAULT_BOOKMARK_FOLDER, tags=(), created=None):
+        """Bookmark a URL; returns (bookmark_id, created) and refreshes the title of an existing entry"""
+        folder_id = self.folder_id(folder)
+        with self.db:
+            existing = self.db.execute("SELECT id FROM bookmarks WHERE url = ?", (url,)).fetchone()
+            if existing:
+                self.db.execute("UPDATE bookmarks SET title = ? WHERE id = ? AND title != ?",
+                                (title, existing[0], title))
+                return existing[0], False
+            cursor = self.db.execute(
+                "INSERT INTO bookmarks (url, title, folder_id, created) VALUES (?, ?, ?, ?)",
+                (url, title, folder_id, created or time.time()))
+            bookmark_id = cursor.lastrowid
+            self.db.executemany("INSERT OR IGNORE INTO bookmark_tags (tag, bookmark_id) VALUES (?, ?)",
+                                [(tag, bookmark_id) for tag in tags])
+        return bookmark_id, True
+    
+    def add_many(self, entries, folder=DEFAULT_BOOKMARK_FOLDER):
+        """Insert (url, title, created) rows in one transaction, skipping known URLs"""
+        folder_id = self.folder_id(folder)
+        with self.db:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO bookmarks (url, title, folder_id, created) VALUES (?, ?, ?, ?)",
+                ((url, title or "", folder_id, created or time.time()) for url, title, created in entries))
+            return self.db.total_changes - before
+    
+    def is_bookmarked(self, url):
+        return self.db.execute("SELECT 1 FROM bookmarks WHERE url = ?", (url,)).fetchone() is not None
+    
+    def remove(self, bookmark_id):
+        with self.db:
+            self.db.execute("DELETE FROM bookmark_tags WHERE bookmark_id = ?", (bookmark_id,))
+            self.db.execute("DELETE FROM bookmarks WHERE id = ?", (bookmark_id,))
+    
+    def move(self, bookmark_id, folder):
+        with self.db:
+            self.db.execute("UPDATE bookmarks SET folder_id = ? WHERE id = ?", (self.folder_id(folder), bookmark_id))
+    
+    def tags(self, bookmark_id):
+        return [row[0] for row in self.db.execute(
+            "SELECT tag FROM bookmark_tags WHERE bookmark_id = ? ORDER BY tag", (bookmark_id,))]
+    
+    def set_tags(self, bookmark_id, tags):
+        with self.db:
+            self.db.execute("DELETE FROM bookmark_tags WHERE bookmark_id = ?", (bookmark_id,))
+            self.db.executemany("INSERT OR IGNORE INTO bookmark_tags (tag, bookmark_id) VALUES (?, ?)",
+                                [(tag, bookmark_id) for tag in tags])
+    
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM bookmarks").fetchone()[0]
+    
+    def page(self, query="", folder_id=None, cursor=None, limit=200):
+        """Return (rows, next_cursor); rows are (id, url, title, folder, tags), newest first"""
+        where = ["1"]
+        params = []
+        if cursor is not None:
+            # Keyset pagination on id keeps deep pages cheap
+            where.append("b.id < ?")
+            params.append(cursor)
+        if folder_id is not None:
+            where.append("b.folder_id = ?")
+            params.append(folder_id)
+        query = query.strip()
+        if query:
+            pattern = f"%{query}%"
+            where.append("(b.title LIKE ? OR b.url LIKE ? OR b.id IN "
+                         "(SELECT bookmark_id FROM bookmark_tags WHERE tag = ?))")
+            params += [pattern, pattern, query.lower()]
+        rows = self.db.execute(f"""
+            SELECT b.id, b.url, b.title, f.name,
+                   (SELECT group_concat(tag, ', ') FROM bookmark_tags t WHERE t.bookmark_id = b.id)
+            FROM bookmarks b LEFT JOIN folders f ON f.id = b.folder_id
+            WHERE {' AND '.join(where)}
+            ORDER BY b.id DESC LIMIT ?
+        """, params + [limit]).fetchall()
+        return rows, (rows[-1][0] if len(rows) == limit else None)
+    
+    def import_legacy(self, settings):
+        """Move bookmarks saved as a JSON string in QSettings into the store"""
+        legacy = settings.value("bookmarks", None)
+        if not legacy:
+            return 0
+        try:
+            entries = []
+            for bm in json.loads(legacy):
+                created = None
+                try:
+                    created = datetime.fromisoformat(bm.get("date", "")).timestamp()
+                except ValueError:
+                    pass
+                entries.append((bm["url"], bm.get("title", ""), created))
+            added = self.add_many(entries)
+            settings.remove("bookmarks")
+            return added
+        except Exception as e:
+            print(f"Bookmark migration error: {e}")
+            return 0
+
+
+class SiteSettingsStore:
+    """Per-host preferences kept in SQLite and mirrored in dicts for O(1) lookups"""
+    WRITE_DELAY = 500  # ms to coalesce bursts such as dragging the zoom slider
+    
+    def __init__(self, path):
+        self.db = open_database(path, SITE_MIGRATIONS)
+        self.zoom = dict(self.db.execute("SELECT host, zoom FROM site_zoom"))
+        self.dark_modes = dict(self.db.execute("SELECT host, mode FROM site_dark_mode"))
+        self.dark_verdicts = {host: bool(is_dark) for host, is_dark in
+                              self.db.execute("SELECT host, is_dark FROM site_dark_probe")}
+        self.permissions = {}  # (origin, feature) -> (decision, expires or None)
+        for origin, feature, decision, expires in self.db.execute(
+                "SELECT origin, feature, decision, expires FROM site_permissions"):
+            self.permissions[(origin, feature)] = (decision, expires)
+        self.pending_zoom = {}  # host -> factor, None to delete
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.WRITE_DELAY)
+        self.flush_timer.timeout.connect(self.flush)
+    
+    def zoom_for(self, host):
+        return self.zoom.get(host, 1.0)
+    
+    def set_zoom(self, host, factor):
+        """Remember a zoom factor for host; 100% is the default and is not stored"""
+        if not host:
+            return
+        factor = round(factor, 2)
+        if factor == 1.0:
+            self.zoom.pop(host, None)
+            self.pending_zoom[host] = None
+        else:
+            self.zoom[host] = factor
+            self.pending_zoom[host] = factor
+        self.flush_timer.start()
+    
+    def flush(self):
+        if not self.pending_zoom:
+            return
+        try:
+            with self.db:
+                self.db.executemany("DELETE FROM site_zoom WHERE host = ?",
+                                    [(host,) for host, factor in self.pending_zoom.items() if factor is None])
+                self.db.executemany("INSERT OR REPLACE INTO site_zoom (host, zoom) VALUES (?, ?)",
+                                    [(host, factor) for host, factor in self.pending_zoom.items() if factor is not None])
+            self.pending_zoom.clear()
+        except sqlite3.Error as e:
+            print(f"Site settings write error: {e}")
+    
+    def set_dark_mode(self, host, mode):
+        """Override the dark mode of a host; None returns it to the default"""
+        try:
+            with self.db:
+                if mode is None:
+                    self.dark_modes.pop(host, None)
+                    self.db.execute("DELETE FROM site_dark_mode WHERE host = ?", (host,))
+                else:
+                    self.dark_modes[host] = mode
+                    self.db.execute("INSERT OR REPLACE INTO site_dark_mode (host, mode) VALUES (?, ?)", (host, mode))
+        except sqlite3.Error as e:
+            print(f"Site settings write error: {e}")
+    
+    def set_dark_verdict(self, host, is_dark):
+        """Cache whether a host is already dark; None forgets it so it is probed again"""
+        try:
+            with self.db:
+                if is_dark is None:
+                    self.dark_verdicts.pop(host, None)
+                    self.db.execute("DELETE FROM site_dark_probe WHERE host = ?", (host,))
+                else:
+                    self.dark_verdicts[host] = is_dark
+                    self.db.execute("INSERT OR REPLACE INTO site_dark_probe (host, is_dark, probed) VALUES (?, ?, ?)",
+                                    (host, int(is_dark), time.time()))
+        except sqlite3.Error as e:
+            print(f"Site settings write error: {e}")
+    
+    def permission(self, origin, feature):
+        """Stored decision for a feature on an origin, or None when the user should be asked"""
+        entry = self.permissions.get((origin, feature))
+        if entry is None:
+            return None
+        decision, expires = entry
+        if expires is not None and expires <= time.time():
+            self.remove_permission(origin, feature)
+            return None
+        return None if decision == PERMISSION_ASK else decision
+    
+    def set_permission(self, origin, feature, decision, expires=None):
+        self.permissions[(origin, feature)] = (decision, expires)
+        try:
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO site_permissions (origin, feature, decision, expires) VALUES (?, ?, ?, ?)",
+                    (origin, feature, decision, expires))
+        except sqlite3.Error as e:
+            print(f"Site settings write error: {e}")
+    
+    def remove_permission(self, origin, feature):
+        self.permissions.pop((origin, feature), None)
+        try:
+            with self.db:
+                self.db.execute("DELETE FROM site_permissions WHERE origin = ? AND feature = ?", (origin, feature))
+        except sqlite3.Error as e:
+            print(f"Site settings write error: {e}")
+    
+    def close(self):
+        self.flush_timer.stop()
+        self.flush()
+        self.db.close()
+
+
+class PermissionsDialog(QDialog):
+    """Review and change remembered site permission decisions"""
+    def __init__(self, site_settings, parent=None):
+        super().__init__(parent)
+        self.site_settings = site_settings
+        self.setWindowTitle("Site Permissions")
+        self.setMinimumSize(620, 400)
+        
+        layout = QVBoxLayout(self)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Site", "Permission", "Decision", "Expires"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tree.setSortingEnabled(True)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.tree)
+        
+        button_layout = QHBoxLayout()
+        for decision in (PERMISSION_GRANT, PERMISSION_DENY, PERMISSION_ASK):
+            btn = QPushButton(PERMISSION_DECISION_NAMES[decision])
+            btn.clicked.connect(lambda checked, d=decision: self.set_selected(d))
+            button_layout.addWidget(btn)
+        remove_btn = QPushButton("Remove")
+        remove_btn.clicked.connect(self.remove_selected)
+        button_layout.addWidget(remove_btn)
+        button_layout.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.refresh()
+    
+    def refresh(self):
+        self.tree.clear()
+        for (origin, feature), (decision, expires) in sorted(self.site_settings.permissions.items()):
+            expiry = datetime.fromtimestamp(expires).strftime("%Y-%m-%d") if expires else "Never"
+            item = QTreeWidgetItem([origin, PERMISSION_FEATURES.get(feature, str(feature)),
+                                    PERMISSION_DECISION_NAMES.get(decision, "?"), expiry])
+            item.setData(0, Qt.UserRole, (origin, feature))
+            self.tree.addTopLevelItem(item)
+    
+    def set_selected(self, decision):
+        # Decisions made here are deliberate, so they do not expire
+        for item in self.tree.selectedItems():
+            origin, feature = item.data(0, Qt.UserRole)
+            self.site_settings.set_permission(origin, feature, decision)
+        self.refresh()
+    
+    def remove_selected(self):
+        for item in self.tree.selectedItems():
+            self.site_settings.remove_permission(*item.data(0, Qt.UserRole))
+        self.refresh()
+
+
+class OmniboxIndex:
+    """Sorted prefix index over history and bookmark URLs, hosts and title words"""
+    SCAN_LIMIT = 3000  # prefix ranges larger than this are served from a memo
+    MEMO_SIZE = 30  # best entries kept per memoized prefix
+    DELTA_LIMIT = 4000  # recent keys kept apart before merging into the main index
+    MEMO_MIN = 10  # memos that shrink below this are rebuilt on next use
+    MAX_TITLE_WORDS = 6
+    BOOKMARK_BONUS = 150
+    
+    def __init__(self):
+        # Per-entry columns, indexed by entry id
+        self.urls = []
+        self.titles = []
+        self.frecency = []  # the URL's own frecency from history
+        self.bookmarked = []
+        self.scores = []  # ranking score: frecency, bookmark bonus and, for site roots, their pages
+        self.url_ids = {}
+        self.host_ids = {}  # bare host -> id of its root entry
+        # Sorted keys with the entry id of each key
+        self.keys = []
+        self.key_ids = []
+        # Keys added since the last merge, also sorted
+        self.delta_keys = []
+        self.delta_ids = []
+        self.memo = {}  # prefix -> entry ids, best first
+    
+    @staticmethod
+    def url_key(url):
+        """Lowercase URL without scheme and leading www."""
+        key = url.lower()
+        scheme_end = key.find("://")
+        if scheme_end >= 0:
+            key = key[scheme_end + 3:]
+        if key.startswith("www."):
+            key = key[4:]
+        return key
+    
+    def title_keys(self, title):
+        words = []
+        for word in title.lower().split()[:self.MAX_TITLE_WORDS]:
+            word = word.strip("()[]{}\"'.,:;!?|-–—")
+            if len(word) >= 2:
+                words.append(sys.intern(word))
+        return words
+    
+    def add(self, url, title="", frecency=None, bookmarked=False, bulk=False):
+        """Add or merge an entry; bulk adds skip sorting until finalize()"""
+        entry_id = self.entry(url, title, bulk)
+        if title and not self.titles[entry_id]:
+            self.set_title(url, title, bulk)
+        if bookmarked and not self.bookmarked[entry_id]:
+            self.bookmarked[entry_id] = True
+            self.adjust(entry_id, self.BOOKMARK_BONUS, bulk)
+        if frecency is not None:
+            self.set_frecency(url, frecency, bulk)
+        return entry_id
+    
+    def set_frecency(self, url, frecency, bulk=False):
+        """Update a URL's frecency and credit the change to its site root"""
+        entry_id = self.entry(url, "", bulk)
+        delta = frecency - self.frecency[entry_id]
+        if not delta:
+            return
+        self.frecency[entry_id] = frecency
+        self.adjust(entry_id, delta, bulk)
+        host_id = self.host_entry(url, bulk)
+        if host_id is not None and host_id != entry_id:
+            self.adjust(host_id, delta, bulk)
+    
+    def record_visit(self, url, transition=TRANSITION_LINK, visit_time=None):
+        """Credit a new visit until the history writer reports the recomputed frecency"""
+        visit_time = visit_time or time.time()
+        entry_id = self.add(url)
+        weight, _ = visit_weight(visit_time, transition, time.time())
+        self.set_frecency(url, self.frecency[entry_id] + weight)
+    
+    def add_bookmark(self, url, title=""):
+        self.add(url, title, bookmarked=True)
+    
+    def set_title(self, url, title, bulk=False):
+        """Index the words of a new title; words of an old title stay until the next rebuild"""
+        entry_id = self.url_ids.get(url)
+        if entry_id is None or not title or self.titles[entry_id] == title:
+            return
+        self.titles[entry_id] = title
+        for word in self.title_keys(title):
+            self.add_key(word, entry_id, bulk)
+    
+    def clear_history(self):
+        """Forget everything except bookmarked entries"""
+        bookmarks = [(self.urls[i], self.titles[i]) for i in range(len(self.urls)) if self.bookmarked[i]]
+        self.__init__()
+        for url, title in bookmarks:
+            self.add(url, title, bookmarked=True, bulk=True)
+        self.finalize()
+    
+    def entry(self, url, title, bulk):
+        entry_id = self.url_ids.get(url)
+        if entry_id is not None:
+            return entry_id
+        entry_id = len(self.urls)
+        self.url_ids[url] = entry_id
+        self.urls.append(url)
+        self.titles.append(title or "")
+        self.frecency.append(0.0)
+        self.bookmarked.append(False)
+        self.scores.append(0.0)
+        self.add_key(self.url_key(url), entry_id, bulk)
+        for word in self.title_keys(title or ""):
+            self.add_key(word, entry_id, bulk)
+        return entry_id
+    
+    def host_entry(self, url, bulk):
+        parts = urlparse(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return None
+        host = self.url_key(parts.netloc)
+        if host not in self.host_ids:
+            self.host_ids[host] = self.entry(f"{parts.scheme}://{parts.netloc}/", parts.netloc, bulk)
+        return self.host_ids[host]
+    
+    def adjust(self, entry_id, delta, bulk):
+        old_score = self.scores[entry_id]
+        self.scores[entry_id] = old_score + delta
+        if not bulk and self.memo:
+            self.update_memo(entry_id, old_score)
+    
+    def update_memo(self, entry_id, old_score):
+        """Re-rank an entry inside every memoized prefix it belongs to"""
+        new_score = self.scores[entry_id]
+        keys = [self.url_key(self.urls[entry_id])] + self.title_keys(self.titles[entry_id])
+        for key in keys:
+            for length in range(1, len(key) + 1):
+                prefix = key[:length]
+                top = self.memo.get(prefix)
+                if top is None:
+                    continue
+                member = entry_id in top
+                if member:
+                    top.remove(entry_id)
+                pos = 0
+                while pos < len(top) and self.scores[top[pos]] >= new_score:
+                    pos += 1
+                # Past the end of the memo an entry's rank relative to
+                # unmemoized entries is unknown, so it only stays in when
+                # it was a member and did not lose score
+                if pos < len(top) or (member and new_score >= old_score):
+                    top.insert(pos, entry_id)
+                    del top[self.MEMO_SIZE:]
+                elif len(top) < self.MEMO_MIN:
+                    del self.memo[prefix]
+    
+    def add_key(self, key, entry_id, bulk):
+        if bulk:
+            self.keys.append(key)
+            self.key_ids.append(entry_id)
+            return
+        pos = bisect.bisect_left(self.delta_keys, key)
+        self.delta_keys.insert(pos, key)
+        self.delta_ids.insert(pos, entry_id)
+        if len(self.delta_keys) > self.DELTA_LIMIT:
+            self.merge_delta()
+    
+    def merge_delta(self):
+        """Merge the sorted delta into the sorted main keys in one pass of slice copies"""
+        keys = []
+        key_ids = []
+        start = 0
+        for key, entry_id in zip(self.delta_keys, self.delta_ids):
+            pos = bisect.bisect_right(self.keys, key, start)
+            keys += self.keys[start:pos]
+            key_ids += self.key_ids[start:pos]
+            keys.append(key)
+            key_ids.append(entry_id)
+            start = pos
+        keys += self.keys[start:]
+        key_ids += self.key_ids[start:]
+        self.keys = keys
+        self.key_ids = key_ids
+        self.delta_keys = []
+        self.delta_ids = []
+    
+    def finalize(self):
+        """Sort keys after bulk adds"""
+        pairs = list(zip(self.keys, self.key_ids))
+        pairs.extend(zip(self.delta_keys, self.delta_ids))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_ids = [entry_id for _, entry_id in pairs]
+        self.delta_keys = []
+        self.delta_ids = []
+    
+    def warm(self):
+        """Memoize the best entries of every prefix too broad to scan per keystroke"""
+        stack = [""]
+        while stack:
+            prefix = stack.pop()
+            lo, hi = self.key_range(self.keys, prefix)
+            if prefix:
+                self.memo[prefix] = self.top(set(self.key_ids[lo:hi]))
+            # Descend into each one-character extension that is still broad
+            depth = len(prefix)
+            pos = lo
+            while pos < hi:
+                key = self.keys[pos]
+                if len(key) <= depth:
+                    pos += 1
+                    continue
+                child = key[:depth + 1]
+                end = bisect.bisect_left(self.keys, child + "\uffff", pos, hi)
+                if end - pos > self.SCAN_LIMIT:
+                    stack.append(child)
+                pos = end
+    
+    @staticmethod
+    def key_range(keys, prefix):
+        return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + "\uffff")
+    
+    def range_size(self, prefix):
+        lo, hi = self.key_range(self.keys, prefix)
+        return hi - lo
+    
+    def top(self, entry_ids):
+        return heapq.nlargest(self.MEMO_SIZE, entry_ids, key=self.scores.__getitem__)
+    
+    def matching(self, prefix):
+        """Every entry id with a key starting with prefix"""
+        lo, hi = self.key_range(self.keys, prefix)
+        delta_lo, delta_hi = self.key_range(self.delta_keys, prefix)
+        entry_ids = set(self.key_ids[lo:hi])
+        entry_ids.update(self.delta_ids[delta_lo:delta_hi])
+        return entry_ids
+    
+    def candidates(self, prefix):
+        """Best entry ids with a key starting with prefix"""
+        if self.range_size(prefix) <= self.SCAN_LIMIT:
+            return self.matching(prefix)
+        if prefix not in self.memo:
+            self.memo[prefix] = self.top(self.matching(prefix))
+        return self.memo[prefix]
+    
+    def query(self, text, limit=8):
+        """Return up to limit (url, title, bookmarked, score) suggestions for typed text"""
+        terms = [self.url_key(term) for term in text.lower().split()]
+        if not terms:
+            return []
+        # Look up the most selective term and filter by the others
+        terms.sort(key=self.range_size)
+        entry_ids = self.candidates(terms[0])
+        rest = terms[1:]
+        if rest:
+            def matches(i):
+                url, title = self.urls[i].lower(), self.titles[i].lower()
+                return all(term in url or term in title for term in rest)
+            entry_ids = [i for i in entry_ids if matches(i)]
+            if len(entry_ids) < limit and self.range_size(terms[0]) > self.SCAN_LIMIT:
+                # A memo holds only the best entries of a broad prefix and too few of
+                # them match the other terms; anything else ranks lower, so scan it all
+                entry_ids = [i for i in self.matching(terms[0]) if matches(i)]
+        best = heapq.nlargest(limit, entry_ids, key=self.scores.__getitem__)
+        return [(self.urls[i], self.titles[i], self.bookmarked[i], self.scores[i]) for i in best]
+
+
+class OmniboxLoader(QThread):
+    """Builds an OmniboxIndex from the history and bookmark databases off the GUI thread"""
+    loaded = pyqtSignal(object)
+    
+    def __init__(self, history_path, bookmark_path, parent=None):
+        super().__init__(parent)
+        self.history_path = history_path
+        self.bookmark_path = bookmark_path
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def run(self):
+        index = OmniboxIndex()
+        try:
+            conn = sqlite3.connect(self.history_path, timeout=10)
+            for url, title, frecency in conn.execute("SELECT url, title, frecency FROM urls"):
+                if self.cancelled:
+                    break
+                index.add(url, title or "", frecency, bulk=True)
+            conn.close()
+            conn = sqlite3.connect(self.bookmark_path, timeout=10)
+            for url, title in conn.execute("SELECT url, title FROM bookmarks"):
+                if self.cancelled:
+                    break
+                index.add(url, title or "", bookmarked=True, bulk=True)
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Omnibox index error: {e}")
+        if self.cancelled:
+            return
+        index.finalize()
+        index.warm()
+        self.loaded.emit(index)
+
+
+class ConnectionPredictor(QObject):
+    """Warms DNS and connections for sites the user is likely to open next"""
+    HINT_TTL = 10  # seconds a preconnected socket is assumed to stay warm
+    HIT_WINDOW = 30  # seconds a prediction may precede the navigation it predicted
+    
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.enabled = settings.value("preconnect_enabled", True, type=bool)
+        self.prerender = settings.value("prerender_predictions", False, type=bool)
+        self.min_confidence = settings.value("preconnect_min_confidence", 0.5, type=float)
+        self.hint_page = None
+        self.prerender_page = None
+        self.predictions = {}  # host -> (source, time predicted)
+        try:
+            self.stats = json.loads(settings.value("preconnect_stats", "") or "{}")
+        except ValueError:
+            self.stats = {}
+        
+        # Only hovers that last a moment count as intent
+        self.hover_url = ""
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.setInterval(settings.value("preconnect_hover_delay_ms", 200, type=int))
+        self.hover_timer.timeout.connect(lambda: self.preconnect(self.hover_url, "hover"))
+    
+    def count(self, source, outcome):
+        source_stats = self.stats.setdefault(source, {"issued": 0, "hits": 0, "misses": 0})
+        source_stats[outcome] += 1
+    
+    def predict_from_suggestions(self, suggestions):
+        """Preconnect to the top omnibox suggestion when it clearly dominates the rest"""
+        if not self.enabled or not suggestions:
+            return
+        url, score = suggestions[0][0], suggestions[0][3]
+        total = sum(suggestion[3] for suggestion in suggestions)
+        if score <= 0 or score / total < self.min_confidence:
+            return
+        self.preconnect(url, "omnibox")
+        if self.prerender:
+            self.prerender_url(url)
+    
+    def link_hovered(self, url):
+        if not self.enabled:
+            return
+        self.hover_url = url
+        if url:
+            self.hover_timer.start()
+        else:
+            self.hover_timer.stop()
+    
+    def preconnect(self, url, source):
+        """Resolve and connect to the host of url ahead of a navigation"""
+        parts = urlparse(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return
+        now = time.time()
+        self.expire(now)
+        host = parts.hostname
+        if host in self.predictions and now - self.predictions[host][1] < self.HINT_TTL:
+            return
+        self.predictions[host] = (source, now)
+        self.count(source, "issued")
+        
+        # Resource hints in a hidden page share the profile's socket pool
+        # with every tab, so the navigation finds the connection warm
+        if self.hint_page is None:
+            self.hint_page = QWebEnginePage(self)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        self.hint_page.setHtml(
+            f'<link rel="dns-prefetch" href="//{escape(parts.netloc)}">'
+            f'<link rel="preconnect" href="{escape(origin)}">')
+    
+    def prerender_url(self, url):
+        """Load a likely next page off screen so its resources are cached"""
+        if self.prerender_page is None:
+            self.prerender_page = QWebEnginePage(self)
+            self.prerender_page.setAudioMuted(True)
+        if self.prerender_page.url().toString() != url:
+            self.prerender_page.setUrl(QUrl(url))
+    
+    def on_navigation(self, url):
+        """Score pending predictions against a committed navigation"""
+        now = time.time()
+        self.expire(now)
+        prediction = self.predictions.pop(urlparse(url).hostname or "", None)
+        if prediction:
+            self.count(prediction[0], "hits")
+    
+    def expire(self, now):
+        for host, (source, predicted_at) in list(self.predictions.items()):
+            if now - predicted_at > self.HIT_WINDOW:
+                del self.predictions[host]
+                self.count(source, "misses")
+    
+    def reset_stats(self):
+        self.stats = {}
+        self.save()
+    
+    def save(self):
+        self.settings.setValue("preconnect_enabled", self.enabled)
+        self.settings.setValue("prerender_predictions", self.prerender)
+        self.settings.setValue("preconnect_min_confidence", self.min_confidence)
+        self.settings.setValue("preconnect_stats", json.dumps(self.stats))
+    
+    def summary(self):
+        """HTML table of issued predictions and their hit rate per source"""
+        rows = []
+        for source, counts in sorted(self.stats.items()):
+            scored = counts["hits"] + counts["misses"]
+            rate = f"{100 * counts['hits'] / scored:.0f}%" if scored else "-"
+            rows.append(f"<tr><td>{source}</td><td>{counts['issued']}</td><td>{counts['hits']}</td>"
+                        f"<td>{counts['misses']}</td><td>{rate}</td></tr>")
+        if not rows:
+            return "<p>No predictions yet.</p>"
+        return ("<table cellpadding='4'><tr><th>Source</th><th>Issued</th><th>Hits</th>"
+                "<th>Misses</th><th>Hit Rate</th></tr>" + "".join(rows) + "</table>")
+
+
+class KeywordTable:
+    """Keyword and bang shortcuts compiled into a single dict lookup"""
+    def __init__(self, settings):
+        self.settings = settings
+        self.user_engines = {}
+        self.table = {}
+        self.load()
+    
+    def load(self):
+        try:
+            self.user_engines = json.loads(self.settings.value("keyword_engines", "") or "{}")
+        except ValueError:
+            self.user_engines = {}
+        self.compile()
+    
+    def compile(self):
+        """Build the keyword -> URL prefix table; "!name" works for every keyword and engine"""
+        table = {}
+        for name, url in SEARCH_ENGINES.items():
+            table["!" + name.lower()] = url
+        for keyword, url in self.engines().items():
+            keyword = keyword.lower()
+            table[keyword] = url
+            if not keyword.startswith("!"):
+                table["!" + keyword] = url
+        self.table = table
+    
+    def engines(self):
+        """Effective keyword engines, user entries overriding the defaults"""
+        engines = dict(KEYWORD_ENGINES)
+        engines.update(self.user_engines)
+        # Defaults the user removed are stored with an empty URL
+        return {keyword: url for keyword, url in engines.items() if url}
+    
+    def set_user_engines(self, engines):
+        self.user_engines = engines
+        self.settings.setValue("keyword_engines", json.dumps(engines))
+        self.compile()
+    
+    def resolve(self, text):
+        """Return (search_url, query) for "kw query", "!kw query" or "query !kw", else None"""
+        keyword, _, query = text.partition(" ")
+        url = self.table.get(keyword.lower())
+        if url is None:
+            # A trailing bang, DuckDuckGo style
+            query, _, keyword = text.rpartition(" ")
+            if not keyword.startswith("!"):
+                return None
+            url = self.table.get(keyword.lower())
+            if url is None:
+                return None
+        query = query.strip()
+        if not query:
+            return None
+        return f"{url}{quote(query)}", query
+
+
+class SearchSuggestions:
+    """Past search queries, prefix-searchable and cached in a JSON file"""
+    MAX_ENTRIES = 5000
+    SCAN_LIMIT = 2000
+    
+    def __init__(self, path):
+        self.path = path
+        self.counts = {}
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.counts = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self.queries = sorted(self.counts)
+    
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.lower().split())
+    
+    def record(self, query):
+        query = self.normalize(query)
+        if not query:
+            return
+        if query not in self.counts:
+            bisect.insort(self.queries, query)
+            self.counts[query] = 0
+        self.counts[query] += 1
+        self.dirty = True
+    
+    def suggest(self, prefix, limit=3):
+        """Most used past queries starting with prefix"""
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.queries, prefix)
+        hi = min(bisect.bisect_left(self.queries, prefix + "\uffff"), lo + self.SCAN_LIMIT)
+        matches = [query for query in self.queries[lo:hi] if query != prefix]
+        return heapq.nlargest(limit, matches, key=self.counts.__getitem__)
+    
+    def save(self):
+        if not self.dirty:
+            return
+        counts = self.counts
+        if len(counts) > self.MAX_ENTRIES:
+            keep = heapq.nlargest(self.MAX_ENTRIES, counts, key=counts.__getitem__)
+            counts = {query: counts[query] for query in keep}
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(counts, f)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Search suggestions save error: {e}")
+    
+    def clear(self):
+        """Forget every query and delete the cache file"""
+        self.counts = {}
+        self.queries = []
+        self.dirty = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Search suggestions clear error: {e}")
+
+
+class KeywordEnginesDialog(QDialog):
+    """Edit keyword search shortcuts"""
+    def __init__(self, keyword_table, parent=None):
+        super().__init__(parent)
+        self.keyword_table = keyword_table
+        self.setWindowTitle("Keyword Search Engines")
+        self.setMinimumSize(560, 380)
+        
+        layout = QVBoxLayout(self)
+        hint = QLabel("Type a keyword and a query in the address bar, e.g. <b>!w qt</b> "
+                      "or <b>qt !w</b>. Keywords without a leading ! also work bare, e.g. <b>w qt</b>.")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Keyword", "Search URL"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.Stretch)
+        for keyword, url in sorted(keyword_table.engines().items()):
+            self.add_row(keyword, url)
+        layout.addWidget(self.tree)
+        
+        button_layout = QHBoxLayout()
+        add_btn = QPushButton("Add")
+        add_btn.clicked.connect(lambda: self.tree.editItem(self.add_row("", "https://"), 0))
+        remove_btn = QPushButton("Remove")
+        remove_btn.clicked.connect(self.remove_selected)
+        button_layout.addWidget(add_btn)
+        button_layout.addWidget(remove_btn)
+        button_layout.addStretch()
+        layout.addLayout(button_layout)
+        
+        btn_box = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel)
+        btn_box.accepted.connect(self.save)
+        btn_box.rejected.connect(self.reject)
+        layout.addWidget(btn_box)
+    
+    def add_row(self, keyword, url):
+        item = QTreeWidgetItem([keyword, url])
+        item.setFlags(item.flags() | Qt.ItemIsEditable)
+        self.tree.addTopLevelItem(item)
+        return item
+    
+    def remove_selected(self):
+        for item in self.tree.selectedItems():
+            self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(item))
+    
+    def save(self):
+        engines = {}
+        for i in range(self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(i)
+            keyword = item.text(0).strip().lower()
+            url = item.text(1).strip()
+            if keyword.lstrip("!") and " " not in keyword and url.startswith(("http://", "https://")):
+                engines[keyword] = url
+        # Only store what differs from the defaults; removed defaults map to ""
+        user_engines = {k: v for k, v in engines.items() if KEYWORD_ENGINES.get(k) != v}
+        user_engines.update({k: "" for k in KEYWORD_ENGINES if k not in engines})
+        self.keyword_table.set_user_engines(user_engines)
+        self.accept()
+
+
+# Seconds between 1601-01-01 (Chrome timestamps) and the Unix epoch
+WEBKIT_EPOCH_OFFSET = 11644473600
+
+IMPORT_SCHEME_FILTER = ", ".join(f"'{scheme}'" for scheme in HISTORY_SCHEMES)
+
+# Set-based INSERT ... SELECT statements per source browser. Each runs over
+# an id range of the attached source database so progress can be reported
+# between transactions. Re-importing is idempotent: counts take the larger
+# value and visits already present are skipped.
+IMPORT_QUERIES = {
+    "chrome": {
+        "urls_max": "SELECT max(id) FROM src.urls",
+        "urls": f"""
+            INSERT INTO urls (url, title, visit_count, typed_count, last_visit, frecency_dirty)
+            SELECT url, title, visit_count, typed_count,
+                   last_visit_time / 1000000.0 - {WEBKIT_EPOCH_OFFSET}, 1
+            FROM src.urls
+            WHERE id > ? AND id <= ? AND hidden = 0
+              AND substr(url, 1, instr(url, ':') - 1) IN ({IMPORT_SCHEME_FILTER})
+            ON CONFLICT(url) DO UPDATE SET
+                visit_count = max(visit_count, excluded.visit_count),
+                typed_count = max(typed_count, excluded.typed_count),
+                last_visit = max(last_visit, excluded.last_visit),
+                title = CASE WHEN title = '' THEN excluded.title ELSE title END,
+                frecency_dirty = 1
+        """,
+        "visits_max": "SELECT max(id) FROM src.visits",
+        "visits": f"""
+            INSERT INTO visits (url_id, visit_time, transition)
+            SELECT u.id, t.visit_time, t.transition FROM (
+                SELECT su.url AS url,
+                       v.visit_time / 1000000.0 - {WEBKIT_EPOCH_OFFSET} AS visit_time,
+                       CASE
+                           WHEN v.transition & 3221225472 THEN {TRANSITION_REDIRECT}
+                           WHEN v.transition & 16777216 THEN {TRANSITION_BACK_FORWARD}
+                           WHEN v.transition & 255 IN (1, 2, 5, 9) THEN {TRANSITION_TYPED}
+                           WHEN v.transition & 255 = 0 THEN {TRANSITION_LINK}
+                           WHEN v.transition & 255 = 7 THEN {TRANSITION_FORM}
+                           WHEN v.transition & 255 = 8 THEN {TRANSITION_RELOAD}
+                           ELSE {TRANSITION_OTHER}
+                       END AS transition
+                FROM src.visits v JOIN src.urls su ON su.id = v.url
+                WHERE v.id > ? AND v.id <= ? AND v.transition & 255 NOT IN (3, 4)
+            ) t JOIN urls u ON u.url = t.url
+            WHERE NOT EXISTS (SELECT 1 FROM visits x WHERE x.url_id = u.id AND x.visit_time = t.visit_time)
+        """,
+    },
+    "firefox": {
+        "urls_max": "SELECT max(id) FROM src.moz_places",
+        "urls": f"""
+            INSERT INTO urls (url, title, visit_count, typed_count, last_visit, frecency_dirty)
+            SELECT url, coalesce(title, ''), visit_count, typed,
+                   coalesce(last_visit_date, 0) / 1000000.0, 1
+            FROM src.moz_places
+            WHERE id > ? AND id <= ? AND hidden = 0 AND visit_count > 0
+              AND substr(url, 1, instr(url, ':') - 1) IN ({IMPORT_SCHEME_FILTER})
+            ON CONFLICT(url) DO UPDATE SET
+                visit_count = max(visit_count, excluded.visit_count),
+                typed_count = max(typed_count, excluded.typed_count),
+                last_visit = max(last_visit, excluded.last_visit),
+                title = CASE WHEN title = '' THEN excluded.title ELSE title END,
+                frecency_dirty = 1
+        """,
+        "visits_max": "SELECT max(id) FROM src.moz_historyvisits",
+        "visits": f"""
+            INSERT INTO visits (url_id, visit_time, transition)
+            SELECT u.id, t.visit_time, t.transition FROM (
+                SELECT p.url AS url,
+                       v.visit_date / 1000000.0 AS visit_time,
+                       CASE v.visit_type
+                           WHEN 1 THEN {TRANSITION_LINK}
+                           WHEN 2 THEN {TRANSITION_TYPED}
+                           WHEN 3 THEN {TRANSITION_TYPED}
+                           WHEN 5 THEN {TRANSITION_REDIRECT}
+                           WHEN 6 THEN {TRANSITION_REDIRECT}
+                           WHEN 9 THEN {TRANSITION_RELOAD}
+                           ELSE {TRANSITION_OTHER}
+                       END AS transition
+                FROM src.moz_historyvisits v JOIN src.moz_places p ON p.id = v.place_id
+                WHERE v.id > ? AND v.id <= ? AND v.visit_type NOT IN (4, 7, 8)
+            ) t JOIN urls u ON u.url = t.url
+            WHERE NOT EXISTS (SELECT 1 FROM visits x WHERE x.url_id = u.id AND x.visit_time = t.visit_time)
+        """,
+        "bookmarks": f"""
+            INSERT OR IGNORE INTO bookmarks (url, title, folder_id, created)
+            SELECT p.url, coalesce(b.title, p.title, ''), ?, coalesce(b.dateAdded, 0) / 1000000.0
+            FROM src.moz_bookmarks b JOIN src.moz_places p ON p.id = b.fk
+            WHERE b.type = 1 AND substr(p.url, 1, instr(p.url, ':') - 1) IN ({IMPORT_SCHEME_FILTER})
+        """,
+    },
+}
+
+# Visits arrive after their URLs were marked dirty, and the history writer may have
+# scored those URLs in between, so mark the URLs of each visit batch dirty again
+IMPORT_MARK_VISITED = """
+    UPDATE urls SET frecency_dirty = 1
+    WHERE frecency_dirty = 0 AND id IN (SELECT url_id FROM visits WHERE id > ?)
+"""
+
+IMPORT_BROWSERS = {"chrome": "Google Chrome", "firefox": "Mozilla Firefox"}
+
+
+def find_browser_profile(kind):
+    """Best guess at the history database of another browser's default profile"""
+    home = os.path.expanduser("~")
+    local = os.environ.get("LOCALAPPDATA", "")
+    roaming = os.environ.get("APPDATA", "")
+    if kind == "chrome":
+        candidates = [
+            os.path.join(home, ".config", "google-chrome", "Default", "History"),
+            os.path.join(home, ".config", "chromium", "Default", "History"),
+            os.path.join(local, "Google", "Chrome", "User Data", "Default", "History"),
+            os.path.join(home, "Library", "Application Support", "Google", "Chrome", "Default", "History"),
+        ]
+    else:
+        candidates = []
+        for base in (os.path.join(home, ".mozilla", "firefox"),
+                     os.path.join(roaming, "Mozilla", "Firefox", "Profiles"),
+                     os.path.join(home, "Library", "Application Support", "Firefox", "Profiles")):
+            candidates += sorted(glob.glob(os.path.join(base, "*", "places.sqlite")))
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    return home
+
+
+class BrowserImporter(QThread):
+    """Streams another browser's history and bookmarks into ours in large set-based batches"""
+    progress = pyqtSignal(int, int, str)  # done, total, stage
+    completed = pyqtSignal(dict)  # report
+    
+    BATCH_ROWS = 50000  # source ids per transaction
+    
+    def __init__(self, kind, source_path, history_path, bookmark_path, dry_run=False, parent=None):
+        super().__init__(parent)
+        self.kind = kind
+        self.source_path = source_path
+        self.history_path = history_path
+        self.bookmark_path = bookmark_path
+        self.dry_run = dry_run
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def run(self):
+        report = {"dry_run": self.dry_run, "counts": {}, "timings": {}}
+        temp_dir = tempfile.mkdtemp(prefix="hixs-import-")
+        try:
+            self.import_into(temp_dir, report)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            report["error"] = str(e)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        report["cancelled"] = self.cancelled
+        self.completed.emit(report)
+    
+    def import_into(self, temp_dir, report):
+        # The source browser may be running and holding locks, so read a copy
+        source = os.path.join(temp_dir, os.path.basename(self.source_path))
+        for suffix in ("", "-wal"):
+            if os.path.exists(self.source_path + suffix):
+                shutil.copyfile(self.source_path + suffix, source + suffix)
+        
+        history_path, bookmark_path = self.history_path, self.bookmark_path
+        if self.dry_run:
+            # Import into throwaway copies for real counts and timings
+            history_path = self.backup(self.history_path, os.path.join(temp_dir, "history.db"))
+            bookmark_path = self.backup(self.bookmark_path, os.path.join(temp_dir, "bookmarks.db"))
+        
+        queries = IMPORT_QUERIES[self.kind]
+        conn = open_history_db(history_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS src", (source,))
+            for stage in ("urls", "visits"):
+                if self.cancelled:
+                    return
+                self.run_batches(conn, stage, queries, report)
+            conn.execute("DETACH DATABASE src")
+        finally:
+            conn.close()
+        
+        if self.cancelled:
+            return
+        self.progress.emit(0, 0, "bookmarks")
+        started = time.perf_counter()
+        conn = open_database(bookmark_path, BOOKMARK_MIGRATIONS)
+        try:
+            folder_id = self.import_folder(conn)
+            if self.kind == "firefox":
+                conn.execute("ATTACH DATABASE ? AS src", (source,))
+                with conn:
+                    added = conn.execute(queries["bookmarks"], (folder_id,)).rowcount
+                conn.execute("DETACH DATABASE src")
+            else:
+                added = self.import_chrome_bookmarks(conn, folder_id)
+        finally:
+            conn.close()
+        report["counts"]["bookmarks"] = added
+        report["timings"]["bookmarks"] = time.perf_counter() - started
+    
+    @staticmethod
+    def backup(path, copy_path):
+        with sqlite3.connect(path) as src, sqlite3.connect(copy_path) as dst:
+            src.backup(dst)
+        return copy_path
+    
+    def run_batches(self, conn, stage, queries, report):
+        started = time.perf_counter()
+        last_id = conn.execute(queries[f"{stage}_max"]).fetchone()[0] or 0
+        count = 0
+        for low in range(0, last_id, self.BATCH_ROWS):
+            if self.cancelled:
+                break
+            with conn:
+                if stage == "visits":
+                    last_visit_id = conn.execute("SELECT coalesce(max(id), 0) FROM visits").fetchone()[0]
+                count += conn.execute(queries[stage], (low, low + self.BATCH_ROWS)).rowcount
+                if stage == "visits":
+                    conn.execute(IMPORT_MARK_VISITED, (last_visit_id,))
+            self.progress.emit(min(low + self.BATCH_ROWS, last_id), last_id, stage)
+        report["counts"][stage] = count
+        report["timings"][stage] = time.perf_counter() - started
+    
+    def import_folder(self, conn):
+        name = f"Imported from {IMPORT_BROWSERS[self.kind]}"
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO folders (name, parent_id) VALUES (?, 0)", (name,))
+        return conn.execute("SELECT id FROM folders WHERE name = ? AND parent_id = 0", (name,)).fetchone()[0]
+    
+    def import_chrome_bookmarks(self, conn, folder_id):
+        """Chrome keeps bookmarks in a JSON file next to its History database"""
+        path = os.path.join(os.path.dirname(self.source_path), "Bookmarks")
+        if not os.path.isfile(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            roots = json.load(f).get("roots", {})
+        
+        rows = []
+        stack = [node for node in roots.values() if isinstance(node, dict)]
+        while stack:
+            node = stack.pop()
+            if node.get("type") == "url":
+                created = int(node.get("date_added") or 0) / 1000000 - WEBKIT_EPOCH_OFFSET
+                rows.append((node.get("url", ""), node.get("name", ""), folder_id, max(created, 0)))
+            stack.extend(node.get("children", []))
+        with conn:
+            return conn.executemany(
+                "INSERT OR IGNORE INTO bookmarks (url, title, folder_id, created) VALUES (?, ?, ?, ?)",
+                [row for row in rows if urlparse(row[0]).scheme in HISTORY_SCHEMES]).rowcount
+
+
+class LazyListDialog(QDialog):
+    """Searchable list that fetches rows page by page as the user scrolls"""
+    PAGE_SIZE = 200
+    COLUMNS = []
+    
+    def __init__(self, browser_window, title, parent=None):
+        super().__init__(parent)
+        self.browser_window = browser_window
+        self.cursor = None
+        self.exhausted = False
+        self.setWindowTitle(title)
+        self.setMinimumSize(800, 540)
+        
+        layout = QVBoxLayout()
+        
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText(f"Search {title.lower()}...")
+        self.search_input.textChanged.connect(lambda text: self.search_timer.start())
+        layout.addWidget(self.search_input)
+        
+        # Debounce typing so each keystroke doesn't hit the database
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.reload)
+        
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(len(self.COLUMNS))
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.itemActivated.connect(self.open_item)
+        self.tree.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        layout.addWidget(self.tree)
+        
+        # Subclasses add their own actions here
+        self.button_layout = QHBoxLayout()
+        layout.addLayout(self.button_layout)
+        
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+        
+        self.setLayout(layout)
+    
+    def fetch_page(self, query, cursor, limit):
+        """Return (rows, next_cursor); each row is (column texts, url)"""
+        raise NotImplementedError
+    
+    def reload(self):
+        """Start over from the first page"""
+        self.tree.clear()
+        self.cursor = None
+        self.exhausted = False
+        self.fetch_more()
+    
+    def fetch_more(self):
+        if self.exhausted:
+            return
+        try:
+            rows, self.cursor = self.fetch_page(self.search_input.text(), self.cursor, self.PAGE_SIZE)
+        except sqlite3.Error as e:
+            self.status.setText(f"Error: {e}")
+            self.exhausted = True
+            return
+        self.exhausted = self.cursor is None
+        items = []
+        for texts, url in rows:
+            item = QTreeWidgetItem([str(text) for text in texts])
+            item.setData(0, Qt.UserRole, url)
+            item.setToolTip(0, url)
+            items.append(item)
+        self.tree.addTopLevelItems(items)
+        count = self.tree.topLevelItemCount()
+        self.status.setText(f"{count} items" + ("" if self.exhausted else " (scroll for more)"))
+    
+    def on_scroll(self, value):
+        scrollbar = self.tree.verticalScrollBar()
+        if value >= scrollbar.maximum() - 20:
+            self.fetch_more()
+    
+    def open_item(self, item):
+        url = item.data(0, Qt.UserRole)
+        if url:
+            self.browser_window.add_new_tab(url)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.reload()
+
+
+class HistoryDialog(LazyListDialog):
+    """Browsing history with full-text search"""
+    COLUMNS = ["Title", "URL", "Last Visited", "Visits"]
+    
+    def __init__(self, browser_window, parent=None):
+        super().__init__(browser_window, "History", parent)
+    
+    def fetch_page(self, query, cursor, limit):
+        rows, next_cursor = self.browser_window.history_store.page(query, cursor, limit)
+        page = []
+        for url, title, last_visit, visit_count in rows:
+            visited = datetime.fromtimestamp(last_visit).strftime("%Y-%m-%d %H:%M")
+            page.append(((title or url, url, visited, visit_count), url))
+        return page, next_cursor
+
+
+class BookmarksDialog(LazyListDialog):
+    """Bookmarks organized by folder and tag"""
+    COLUMNS = ["Title", "URL", "Folder", "Tags"]
+    
+    def __init__(self, browser_window, parent=None):
+        super().__init__(browser_window, "Bookmarks", parent)
+        self.store = browser_window.bookmark_store
+        self.row_ids = {}  # url -> bookmark id for the loaded rows
+        self.tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        
+        self.folder_combo = QComboBox()
+        self.folder_combo.currentIndexChanged.connect(lambda index: self.reload())
+        self.button_layout.addWidget(QLabel("Folder:"))
+        self.button_layout.addWidget(self.folder_combo)
+        self.button_layout.addStretch()
+        
+        for label, handler in (("Edit Tags...", self.edit_tags),
+                               ("Move to Folder...", self.move_selected),
+                               ("Delete", self.delete_selected)):
+            button = QPushButton(label)
+            button.clicked.connect(handler)
+            self.button_layout.addWidget(button)
+    
+    def showEvent(self, event):
+        self.refresh_folders()
+        super().showEvent(event)
+    
+    def refresh_folders(self):
+        self.folder_combo.blockSignals(True)
+        self.folder_combo.clear()
+        self.folder_combo.addItem("All Folders", None)
+        for folder_id, name in self.store.folders():
+            self.folder_combo.addItem(name, folder_id)
+        self.folder_combo.blockSignals(False)
+    
+    def fetch_page(self, query, cursor, limit):
+        rows, next_cursor = self.store.page(query, self.folder_combo.currentData(), cursor, limit)
+        page = []
+        for bookmark_id, url, title, folder, tags in rows:
+            page.append(((title or url, url, folder or "", tags or ""), url))
+        self.row_ids.update({url: bookmark_id for bookmark_id, url, *_ in rows})
+        return page, next_cursor
+    
+    def reload(self):
+        self.row_ids = {}  # url -> bookmark id for the loaded rows
+        super().reload()
+    
+    def selected_ids(self):
+        return [self.row_ids[item.data(0, Qt.UserRole)] for item in self.tree.selectedItems()
+                if item.data(0, Qt.UserRole) in self.row_ids]
+    
+    def edit_tags(self):
+        ids = self.selected_ids()
+        if not ids:
+            return
+        current = ", ".join(self.store.tags(ids[0]))
+        text, ok = QInputDialog.getText(self, "Edit Tags", "Tags (comma separated):", text=current)
+        if ok:
+            tags = {tag.strip().lower() for tag in text.split(",") if tag.strip()}
+            for bookmark_id in ids:
+                self.store.set_tags(bookmark_id, tags)
+            self.reload()
+    
+    def move_selected(self):
+        ids = self.selected_ids()
+        if not ids:
+            return
+        names = [name for _, name in self.store.folders()]
+        folder, ok = QInputDialog.getItem(self, "Move to Folder", "Folder (select or type a new name):",
+                                          names, 0, True)
+        if ok and folder.strip():
+            for bookmark_id in ids:
+                self.store.move(bookmark_id, folder.strip())
+            self.refresh_folders()
+            self.reload()
+    
+    def delete_selected(self):
+        for bookmark_id in self.selected_ids():
+            self.store.remove(bookmark_id)
+        self.reload()
+
+
+# Built-in pages served from memory by HixsSchemeHandler
+HIXS_SCHEME = b"hixs"
+HIXS_HOME_URL = "hixs://home"
+HIXS_PAGE_LIMIT = 200  # rows shown on the bookmarks, history and downloads pages
+
+HIXS_HOME_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Hixs Browser</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            min-height: 100vh;
+            display: flex;
+            flex-direction: column;
+            align-items: center;
+            justify-content: center;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            animation: gradientBG 15s ease infinite;
+        }
+        @keyframes gradientBG {
+            0% { background-position: 0% 50%; }
+            50% { background-position: 100% 50%; }
+            100% { background-position: 0% 50%; }
+        }
+        .container {
+            text-align: center;
+            padding: 40px;
+            background: rgba(255, 255, 255, 0.95);
+            border-radius: 20px;
+            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
+            max-width: 600px;
+            width: 90%;
+            animation: fadeIn 0.8s ease-out;
+        }
+        @keyframes fadeIn {
+            from { opacity: 0; transform: translateY(20px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
+        h1 { color: #667eea; font-size: 2.5em; margin-bottom: 10px; }
+        .tagline { color: #666; font-size: 1.1em; margin-bottom: 30px; }
+        .search-box {
+            width: 100%;
+            padding: 15px 25px;
+            font-size: 18px;
+            border: 2px solid #667eea;
+            border-radius: 50px;
+            outline: none;
+            transition: all 0.3s ease;
+            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.2);
+        }
+        .search-box:focus {
+            border-color: #764ba2;
+            box-shadow: 0 4px 20px rgba(118, 75, 162, 0.3);
+        }
+        .shortcuts {
+            margin-top: 30px;
+            display: flex;
+            justify-content: center;
+            gap: 15px;
+            flex-wrap: wrap;
+        }
+        .shortcut {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+            padding: 10px 15px;
+            background: #f5f5f5;
+            border-radius: 10px;
+            font-size: 14px;
+            color: #555;
+            transition: all 0.3s ease;
+        }
+        .shortcut:hover {
+            background: #667eea;
+            color: white;
+            transform: translateY(-2px);
+        }
+        .shortcut kbd {
+            background: #fff;
+            padding: 3px 8px;
+            border-radius: 4px;
+            font-family: monospace;
+            font-size: 12px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .top-sites {
+            margin-top: 25px;
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 10px;
+        }
+        .top-site {
+            padding: 10px;
+            background: #f5f5f5;
+            border-radius: 10px;
+            font-size: 13px;
+            color: #555;
+            text-decoration: none;
+            overflow: hidden;
+            white-space: nowrap;
+            text-overflow: ellipsis;
+        }
+        .top-site:hover { background: #667eea; color: white; }
+        .footer {
+            margin-top: 30px;
+            color: #888;
+            font-size: 12px;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Hixs Browser</h1>
+        <p class="tagline">Fast, Private, Secure Browsing</p>
+        <input type="text" class="search-box" id="searchInput" 
+               placeholder="Search the web or enter a URL..." 
+               autofocus
+               onkeydown="if(event.key==='Enter'){window.location.href='hixs://search/'+encodeURIComponent(this.value)}">
+        <div class="shortcuts">
+            <div class="shortcut"><kbd>Ctrl</kbd>+<kbd>T</kbd> New Tab</div>
+            <div class="shortcut"><kbd>Ctrl</kbd>+<kbd>W</kbd> Close Tab</div>
+            <div class="shortcut"><kbd>Ctrl</kbd>+<kbd>R</kbd> Refresh</div>
+            <div class="shortcut"><kbd>F11</kbd> Fullscreen</div>
+        </div>
+        <!-- top sites -->
+        <div class="footer">
+            Hixs Browser v2.1 - Privacy First<br>
+            Developed by: geethudinoyt (ruthvik pedapondara)
+        </div>
+    </div>
+    <script>document.getElementById('searchInput').focus();</script>
+</body>
+</html>
+"""
+
+HIXS_LIST_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>%(title)s - Hixs Browser</title>
+    <style>
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; background: #f5f5f5; color: #333; }
+        header { background: linear-gradient(135deg, #667eea 0%%, #764ba2 100%%); color: white; padding: 20px 40px; }
+        header a { color: white; margin-right: 20px; text-decoration: none; opacity: 0.85; }
+        header a:hover { opacity: 1; }
+        h1 { margin: 0 0 10px; font-size: 1.8em; }
+        ul { list-style: none; margin: 20px 40px; padding: 0; }
+        li { background: white; border-radius: 8px; margin-bottom: 6px; padding: 10px 15px; display: flex; gap: 15px; }
+        li a { color: #667eea; text-decoration: none; flex: 1; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }
+        li span { color: #888; font-size: 12px; white-space: nowrap; }
+        .empty { margin: 20px 40px; color: #888; }
+    </style>
+</head>
+<body>
+    <header>
+        <h1>%(title)s</h1>
+        <a href="hixs://home">Home</a><a href="hixs://bookmarks">Bookmarks</a><a href="hixs://history">History</a><a href="hixs://downloads">Downloads</a>
+    </header>
+    %(body)s
+</body>
+</html>
+"""
+
+
+def register_url_schemes():
+    """Register hixs:// with the web engine; must run before QApplication is created"""
+    scheme = QWebEngineUrlScheme(HIXS_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.LocalAccessAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def create_application(argv):
+    """Create the QApplication with everything that must be set up around its construction"""
+    # Enable High DPI support
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    
+    # Chromium reads its flags once, when the first QApplication is created
+    startup_settings = QSettings("HixsBrowser", "HixsBrowser")
+    if (startup_settings.value("force_dark_website", False, type=bool)
+            and startup_settings.value("dark_mode_engine", "css") == "native"):
+        flags = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "")
+        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = f"{flags} {NATIVE_DARK_MODE_FLAG}".strip()
+    
+    register_url_schemes()
+    
+    app = QApplication(argv)
+    app.setApplicationName("Hixs Browser")
+    app.setOrganizationName("Hixs Studios")
+    
+    # Set application font
+    font = QFont("Segoe UI", 9)
+    app.setFont(font)
+    return app
+
+
+class HixsSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serves hixs:// pages from a cache that is rebuilt only when the data behind a page changes"""
+    def __init__(self, browser_window):
+        super().__init__(browser_window)
+        self.browser_window = browser_window
+        self.cache = {}  # page -> (data version, QByteArray)
+        self.builders = {
+            "home": (self.history_version, self.build_home),
+            "bookmarks": (self.bookmarks_version, self.build_bookmarks),
+            "history": (self.history_version, self.build_history),
+            "downloads": (self.downloads_version, self.build_downloads),
+        }
+    
+    def requestStarted(self, job):
+        try:
+            url = job.requestUrl()
+            page = url.host()
+            if page == "search":
+                query = url.path(QUrl.FullyDecoded).lstrip("/")
+                job.redirect(QUrl(self.search_results_url(query)))
+                return
+            if page not in self.builders:
+                job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+                return
+            buffer = QBuffer(job)
+            buffer.setData(self.page_data(page))
+            buffer.open(QIODevice.ReadOnly)
+            job.reply(b"text/html", buffer)
+        except Exception as e:
+            print(f"hixs:// error: {e}")
+            job.fail(QWebEngineUrlRequestJob.RequestFailed)
+    
+    def search_results_url(self, query):
+        """Web search results for a hixs://search query; any page can load one, so only http(s) targets and no suggestion recording"""
+        window = self.browser_window
+        query = query.strip()
+        keyword_search = window.keyword_table.resolve(query) if " " in query else None
+        if keyword_search and keyword_search[0].startswith(("http://", "https://")):
+            return keyword_search[0]
+        search_url = SEARCH_ENGINES.get(window.current_search_engine, SEARCH_ENGINES["Google"])
+        return f"{search_url}{quote(query)}"
+    
+    def page_data(self, page):
+        """Cached document for a page, rebuilt if its data changed since it was cached"""
+        version_of, build = self.builders[page]
+        version = version_of()
+        cached = self.cache.get(page)
+        if cached is None or cached[0] != version:
+            cached = self.cache[page] = (version, QByteArray(build().encode("utf-8")))
+        return cached[1]
+    
+    def history_version(self):
+        return data_version(self.browser_window.history_store.db)
+    
+    def bookmarks_version(self):
+        return data_version(self.browser_window.bookmark_store.db)
+    
+    def downloads_version(self):
+        manager = self.browser_window.download_manager
+        try:
+            folder_mtime = os.stat(manager.downloads_path).st_mtime_ns
+        except OSError:
+            folder_mtime = 0
+        return folder_mtime, manager.download_counter, len(manager.active_downloads)
+    
+    def list_page(self, title, items):
+        """Render (href, label, detail) rows with the shared list layout"""
+        rows = "".join(
+            f'<li><a href="{escape(href)}" title="{escape(href)}">{escape(label or href)}</a><span>{escape(detail)}</span></li>'
+            for href, label, detail in items)
+        body = f"<ul>{rows}</ul>" if rows else '<p class="empty">Nothing here yet.</p>'
+        return HIXS_LIST_HTML % {"title": escape(title), "body": body}
+    
+    def build_home(self):
+        tiles = "".join(
+            f'<a class="top-site" href="{escape(url)}" title="{escape(url)}">{escape(title or urlparse(url).netloc or url)}</a>'
+            for url, title in self.browser_window.history_store.top_sites(8))
+        if tiles:
+            return HIXS_HOME_HTML.replace("<!-- top sites -->", f'<div class="top-sites">{tiles}</div>')
+        return HIXS_HOME_HTML
+    
+    def build_bookmarks(self):
+        rows, _ = self.browser_window.bookmark_store.page(limit=HIXS_PAGE_LIMIT)
+        return self.list_page("Bookmarks", [
+            (url, title, " · ".join(part for part in (folder, tags) if part))
+            for _, url, title, folder, tags in rows])
+    
+    def build_history(self):
+        rows, _ = self.browser_window.history_store.page(limit=HIXS_PAGE_LIMIT)
+        return self.list_page("History", [
+            (url, title, datetime.fromtimestamp(last_visit).strftime("%Y-%m-%d %H:%M"))
+            for url, title, last_visit, visit_count in rows])
+    
+    def build_downloads(self):
+        manager = self.browser_window.download_manager
+        active = {file_path for _, file_path in manager.active_downloads.values()}
+        items = [(QUrl.fromLocalFile(path).toString(), os.path.basename(path), "Downloading")
+                 for path in sorted(active)]
+        try:
+            entries = [entry for entry in os.scandir(manager.downloads_path)
+                       if entry.is_file() and entry.path not in active]
+        except OSError:
+            entries = []
+        entries = heapq.nlargest(HIXS_PAGE_LIMIT, entries, key=lambda entry: entry.stat().st_mtime)
+        items += [(QUrl.fromLocalFile(entry.path).toString(), entry.name,
+                   datetime.fromtimestamp(entry.stat().st_mtime).strftime("%Y-%m-%d %H:%M"))
+                  for entry in entries]
+        return self.list_page("Downloads", items)
+
+
+class SingleInstance(QObject):
+    """Local socket guard that lets later launches hand their URLs to the running browser"""
+    CONNECT_TIMEOUT_MS = 500
+    urls_received = pyqtSignal(list)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        user = os.environ.get("USER") or os.environ.get("USERNAME") or "default"
+        self.server_name = f"hixsbrowser-{user}"
+        if sys.platform != "win32":
+            # With UserAccessOption Qt moves a new socket file over a live one, so on
+            # Unix the socket lives in the private runtime directory instead, where
+            # listen() fails while another instance is serving
+            runtime_dir = QStandardPaths.writableLocation(QStandardPaths.RuntimeLocation)
+            if runtime_dir:
+                self.server_name = os.path.join(runtime_dir, f"hixsbrowser-{user}")
+        self.server = None
+        self.buffers = {}  # socket -> bytes received so far
+    
+    def forward(self, urls):
+        """Send urls to a running instance; returns False if none is listening"""
+        socket = QLocalSocket()
+        socket.connectToServer(self.server_name)
+        if not socket.waitForConnected(self.CONNECT_TIMEOUT_MS):
+            return False
+        socket.write(json.dumps(urls).encode("utf-8"))
+        socket.flush()
+        socket.waitForBytesWritten(self.CONNECT_TIMEOUT_MS)
+        socket.disconnectFromServer()
+        return True
+    
+    def listen(self, urls):
+        """Serve later launches; returns False if a launch racing this one got there first and took urls"""
+        self.server = QLocalServer(self)
+        if sys.platform == "win32":
+            self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        if not self.server.listen(self.server_name):
+            # Another launch may have started listening since our forward() failed
+            if self.forward(urls):
+                self.server = None
+                return False
+            # Nobody answered twice, so the socket file is left over from a crash
+            QLocalServer.removeServer(self.server_name)
+            if not self.server.listen(self.server_name):
+                # Run on our own rather than lose the window
+                print(f"Single instance server error: {self.server.errorString()}")
+                return True
+        self.server.newConnection.connect(self.on_new_connection)
+        return True
+    
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self.on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self.on_disconnected(s))
+    
+    def on_ready_read(self, socket):
+        self.buffers[socket] += bytes(socket.readAll())
+    
+    def on_disconnected(self, socket):
+        data = self.buffers.pop(socket, b"") + bytes(socket.readAll())
+        socket.deleteLater()
+        try:
+            urls = json.loads(data.decode("utf-8") or "[]")
+        except ValueError as e:
+            print(f"Single instance message error: {e}")
+            return
+        self.urls_received.emit([url for url in urls if isinstance(url, str)])
+    
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+
+
+def command_line_urls(argv):
+    """URLs and file paths given on the command line, as absolute URLs"""
+    return [QUrl.fromUserInput(arg, os.getcwd()).toString()
+            for arg in argv[1:] if not arg.startswith("-")]
+
+
+class ModernWebBrowser(QMainWindow):
+    """Main browser window with all features"""
+    def __init__(self, profiler=None):
+        super().__init__()
+        self.profiler = profiler or StartupProfiler()
+        self.setWindowTitle("Hixs Browser")
+        self.setGeometry(100, 100, 1400, 900)
+        
+        # Initialize settings
+        self.settings = QSettings("HixsBrowser", "HixsBrowser")
+        self.current_search_engine = self.settings.value("search_engine", "Google")
+        self.dark_mode = self.settings.value("dark_mode", False, type=bool)
+        self.ad_block_enabled = self.settings.value("ad_block_enabled", True, type=bool)
+        self.force_dark_website = self.settings.value("force_dark_website", False, type=bool)
+        self.dark_mode_engine = self.settings.value("dark_mode_engine", "css")
+        self.native_dark_mode = NATIVE_DARK_MODE_FLAG in os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "")
+        self.profiler.mark("settings")
+        self.tracker_count = 0
+        self.tab_groups = []
+        self.tab_registry = TabRegistry()
+        self.tab_search_index = TabSearchIndex()
+        self.tab_switcher = None
+        self.task_manager = None
+        self.history_dialog = None
+        self.history_store = HistoryStore(app_data_path("history.db"))
+        # Quitting from the tray skips closeEvent, so stores are also flushed on aboutToQuit
+        self.shut_down_done = False
+        QApplication.instance().aboutToQuit.connect(self.shut_down)
+        self.history_store.writer.frecency_updated.connect(self.on_frecency_updated)
+        self.history_store.writer.urls_expired.connect(lambda count: self.reload_omnibox_index())
+        self.history_store.set_retention(self.settings.value("history_max_age_days", 365, type=int),
+                                         self.settings.value("history_max_visits", 1000000, type=int))
+        self.bookmark_store = BookmarkStore(app_data_path("bookmarks.db"))
+        self.bookmark_store.import_legacy(self.settings)
+        self.bookmarks_dialog = None
+        self.omnibox_index = OmniboxIndex()
+        self.omnibox_loader = None
+        self.reload_omnibox_index()
+        self.importer = None
+        self.predictor = ConnectionPredictor(self.settings, self)
+        self.keyword_table = KeywordTable(self.settings)
+        self.site_settings = SiteSettingsStore(app_data_path("site_settings.db"))
+        self.scheme_handler = HixsSchemeHandler(self)
+        QWebEngineProfile.defaultProfile().installUrlSchemeHandler(HIXS_SCHEME, self.scheme_handler)
+        self.update_dark_mode_script()
+        self.search_suggestions = SearchSuggestions(app_data_path("search_suggestions.json"))
+        self.load_scheduler = TabLoadScheduler(
+            self, self.settings.value("background_tab_load_limit", 2, type=int))
+        self.spare_tabs = SpareTabPool(self, self.settings.value("spare_tab_count", 1, type=int))
+        self.tab_counter = 0
+        self.find_dialog = None
+        self.profiler.mark("stores")
+        
+        # Check privacy policy agreement on first launch
         self.check_privacy_policy()
+        self.profiler.mark("privacy_check")
         
-        # Create system tray icon
-        self.create_tray_icon()
+        # Subsystems that are not needed for the first frame are built when idle
+        self.tray_icon = None
+        self.idle_init = IdleInitializer(self)
+        self.idle_init.add(self.create_tray_icon)
+        self.idle_init.add(lambda: self.scheme_handler.page_data("home"))
         
         # Apply theme
+        self.theme_palettes = {}  # theme name -> compiled QPalette
+        self.setStyleSheet(THEME_STYLESHEET)
         self.apply_theme()
+        self.profiler.mark("theme")
         
         # Create UI
         self.create_central_widget()
         self.create_toolbar()
         self.create_status_bar()
         self.create_shortcuts()
+        self.profiler.mark("ui")
         
         # Initialize download manager
         self.download_manager = DownloadManager(self)
         
+        # Settings, user agent and downloads are shared by every tab of the profile
+        profile = QWebEngineProfile.defaultProfile()
+        BrowserTab.configure_profile(profile)
+        profile.downloadRequested.connect(self.handle_download)
+        
         # Set window icon
         self.set_window_icon()
+        self.profiler.mark("downloads_profile")
         
         # Add initial tab
         self.add_new_tab()
+        self.profiler.mark("first_tab")
+        self.profiler.watch(self)
         
         # Load saved tabs
         QTimer.singleShot(500, self.load_saved_tabs)
+        
+        # Prepare a spare new tab once startup loads have settled
+        self.spare_tabs.schedule_fill()
     
     def create_tray_icon(self):
         """Create system tray icon"""
         self.tray_icon = QSystemTrayIcon(self)
-        self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
+        icon = self.windowIcon()
+        self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon) if icon.isNull() else icon)
         self.tray_icon.setVisible(True)
         
         tray_menu = QMenu()
@@ -1507,12 +4866,16 @@ class ModernWebBrowser(QMainWindow):
         
         # Create tabs
         self.tabs = QTabWidget()
-        self.tab_bar = CustomTabBar()
+        self.tab_bar = CustomTabBar(self.tab_registry)
         self.tabs.setTabBar(self.tab_bar)
         self.tabs.setTabsClosable(True)
         self.tabs.setMovable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.on_tab_changed)
+        self.tab_bar.tabMoved.connect(self.tab_registry.move)
+        self.tab_bar.tabMoved.connect(lambda from_index, to_index: self.tab_bar.refresh_groups())
+        self.tab_bar.group_toggled.connect(self.toggle_group_collapsed)
+        self.tab_bar.context_menu_requested.connect(self.show_tab_context_menu)
         layout.addWidget(self.tabs)
     
     def create_toolbar(self):
@@ -1596,6 +4959,16 @@ class ModernWebBrowser(QMainWindow):
         """)
         url_layout.addWidget(self.url_bar, stretch=1)
         
+        # Autocomplete from history and bookmarks
+        self.omnibox_model = QStandardItemModel(self)
+        self.omnibox_completer = QCompleter(self.omnibox_model, self)
+        self.omnibox_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.omnibox_completer.setCompletionRole(Qt.UserRole)
+        self.omnibox_completer.setMaxVisibleItems(8)
+        self.url_bar.setCompleter(self.omnibox_completer)
+        self.omnibox_completer.popup().clicked.connect(lambda index: self.navigate_to_url())
+        self.url_bar.textEdited.connect(self.update_omnibox_suggestions)
+        
         toolbar.addWidget(url_container)
         
         toolbar.addSeparator()
@@ -1750,6 +5123,7 @@ class ModernWebBrowser(QMainWindow):
         QShortcut(QKeySequence("Ctrl+7"), self, lambda: self.switch_to_tab(6))
         QShortcut(QKeySequence("Ctrl+8"), self, lambda: self.switch_to_tab(7))
         QShortcut(QKeySequence("Ctrl+9"), self, lambda: self.switch_to_tab(self.tabs.count() - 1))
+        QShortcut(QKeySequence("Ctrl+Shift+A"), self, self.show_tab_switcher)
         
         # File operations
         QShortcut(QKeySequence("Ctrl+O"), self, self.open_file)
@@ -1778,6 +5152,9 @@ class ModernWebBrowser(QMainWindow):
         # Downloads
         QShortcut(QKeySequence("Ctrl+J"), self, self.show_downloads)
         
+        # Task manager
+        QShortcut(QKeySequence("Shift+Esc"), self, self.show_task_manager)
+        
         # Focus URL bar
         QShortcut(QKeySequence("Ctrl+L"), self, self.focus_url_bar)
         QShortcut(QKeySequence("Alt+D"), self, self.focus_url_bar)
@@ -1790,9 +5167,7 @@ class ModernWebBrowser(QMainWindow):
                 pixmap = QPixmap(icon_path)
                 if not pixmap.isNull():
                     pixmap = pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    icon = QIcon(pixmap)
-                    self.setWindowIcon(icon)
-                    self.tray_icon.setIcon(icon)
+                    self.setWindowIcon(QIcon(pixmap))
                     return
             
             # Fallback icon
@@ -1806,9 +5181,7 @@ class ModernWebBrowser(QMainWindow):
             painter.setFont(QFont("Arial", 14, QFont.Bold))
             painter.drawText(pixmap.rect(), Qt.AlignCenter, "H")
             painter.end()
-            icon = QIcon(pixmap)
-            self.setWindowIcon(icon)
-            self.tray_icon.setIcon(icon)
+            self.setWindowIcon(QIcon(pixmap))
         except Exception as e:
             print(f"Icon error: {e}")
     
@@ -1818,72 +5191,111 @@ class ModernWebBrowser(QMainWindow):
         self.tab_counter += 1
         tab_id = self.tab_counter
         
-        browser = BrowserTab(tab_id, self)
-        
         if url is None:
             url = self.get_homepage()
         
-        # Handle hixs://home URL - load custom homepage
-        if url == "hixs://home":
-            self.load_homepage(browser.page())
+        spare = None if background else self.spare_tabs.take(url)
+        if spare:
+            browser = spare[0]
+            browser.tab_id = tab_id
         else:
-            browser.setUrl(QUrl(url))
-        
-        # Set up ad blocking
-        if self.ad_block_enabled:
-            try:
-                interceptor = AdBlockInterceptor(self)
-                browser.page().profile().setUrlRequestInterceptor(interceptor)
-            except Exception as e:
-                print(f"AdBlock setup error: {e}")
-        
-        # Set up download handling
-        browser.page().profile().downloadRequested.connect(self.handle_download)
+            browser = self.create_tab_view(tab_id)
+            if url == "about:blank":
+                pass  # Fresh views are already blank; popups navigate them
+            elif background:
+                self.load_scheduler.request_load(browser, QUrl(url))
+            else:
+                browser.setUrl(QUrl(url))
         
         # Connect signals
+        browser.urlChanged.connect(lambda qurl, b=browser: self.apply_site_zoom(qurl, b))
         browser.urlChanged.connect(lambda qurl, b=browser: self.update_urlbar(qurl, b))
         browser.loadStarted.connect(self.on_load_started)
+        browser.loadStarted.connect(lambda b=browser: self.load_scheduler.on_load_started(b))
+        browser.loadFinished.connect(lambda success, b=browser: self.load_scheduler.on_load_finished(b))
         browser.loadProgress.connect(self.on_load_progress)
         browser.loadFinished.connect(lambda success, b=browser: self.on_load_finished(success, b))
         browser.titleChanged.connect(lambda title, b=browser: self.update_tab_title(title, b))
         browser.iconChanged.connect(lambda icon, b=browser: self.update_tab_icon(icon, b))
         
+        # Warm connections for links the user hovers
+        browser.page().linkHovered.connect(self.predictor.link_hovered)
+        
+        # Record committed navigations in history
+        browser.urlChanged.connect(lambda qurl, b=browser: self.record_history(qurl, b))
+        browser.titleChanged.connect(lambda title, b=browser: self.record_title(title, b))
+        
+        # Keep the tab switcher index current
+        browser.titleChanged.connect(lambda title, b=browser: self.tab_search_index.update(b.tab_id, title=title))
+        browser.urlChanged.connect(lambda qurl, b=browser: self.tab_search_index.update(b.tab_id, url=qurl.toString()))
+        
         # Add tab
         index = self.tabs.addTab(browser, title)
-        browser.tab_index = index
+        self.tab_registry.register(browser, index)
+        self.tab_search_index.update(tab_id, title=title, url=url)
         
         if not background:
             self.tabs.setCurrentIndex(index)
         
-        # Apply dark mode if enabled
-        if self.force_dark_website:
-            QTimer.singleShot(1000, lambda: browser.set_dark_mode(True))
+        if spare:
+            # The spare loaded before its signals were connected; replay what the slots missed
+            browser.urlChanged.emit(browser.url())
+            browser.titleChanged.emit(browser.title())
+            if spare[1] is not None:
+                browser.loadFinished.emit(spare[1])
         
         return browser
     
+    def create_tab_view(self, tab_id):
+        """Create a browser view with ad blocking and per-tab request accounting"""
+        browser = BrowserTab(tab_id, self)
+        browser.site_settings = self.site_settings
+        try:
+            browser.interceptor = AdBlockInterceptor(self, browser, blocking=self.ad_block_enabled)
+            browser.page().setUrlRequestInterceptor(browser.interceptor)
+        except Exception as e:
+            print(f"AdBlock setup error: {e}")
+        return browser
+    
     def create_new_tab(self):
-        """Create new tab for popups"""
-        return self.add_new_tab(background=True)
+        """Create new background tab for popups; its load waits for the scheduler"""
+        browser = self.add_new_tab("about:blank", background=True)
+        browser.page().deferred_loader = lambda qurl, b=browser: self.load_scheduler.request_load(b, qurl)
+        return browser
     
     def close_tab(self, index):
         """Close a tab"""
         if self.tabs.count() > 1:
             browser = self.tabs.widget(index)
             
-            # Remove from groups
-            for group in self.tab_groups:
-                if browser and hasattr(browser, 'tab_id'):
-                    group.remove_tab(browser.tab_id)
-            
             # Properly cleanup
-            self.tabs.removeTab(index)
+            self.remove_tab_at(index)
             if browser:
                 browser.deleteLater()
+            self.prune_tab_groups()
             
             self.save_tabs()
         else:
             self.close()
     
+    def remove_tab_at(self, index):
+        """Remove a tab from the tab widget and the registry"""
+        browser = self.tabs.widget(index)
+        if browser is not None and hasattr(browser, 'tab_id'):
+            self.tab_registry.unregister(browser.tab_id)
+            self.tab_search_index.remove(browser.tab_id)
+            self.load_scheduler.forget(browser.tab_id)
+        self.tab_bar.detach_group_header(index)
+        self.tabs.removeTab(index)
+    
+    def tab_index(self, browser):
+        """Return the index of a tab without scanning the tab widget"""
+        index = self.tab_registry.index_of(browser)
+        if index >= 0 and self.tabs.widget(index) is browser:
+            return index
+        # Registry out of sync (should not happen) - fall back to a scan
+        return self.tabs.indexOf(browser)
+    
     def close_current_tab(self):
         """Close current tab"""
         current_index = self.tabs.currentIndex()
@@ -1906,12 +5318,164 @@ class ModernWebBrowser(QMainWindow):
         if 0 <= index < self.tabs.count():
             self.tabs.setCurrentIndex(index)
     
+    def show_tab_switcher(self):
+        """Show the quick tab switcher (Ctrl+Shift+A)"""
+        if not self.tab_switcher:
+            self.tab_switcher = TabSwitcherDialog(self, self)
+        self.tab_switcher.popup()
+    
+    def activate_tab(self, tab_id):
+        """Switch to the tab with the given ID"""
+        record = self.tab_registry.get(tab_id)
+        if record is not None:
+            self.tabs.setCurrentIndex(record.index)
+    
+    def show_tab_context_menu(self, index, pos):
+        """Show tab group actions for a tab"""
+        browser = self.tabs.widget(index)
+        if not browser:
+            return
+        record = self.tab_registry.get(browser.tab_id)
+        group = next(iter(record.groups)) if record and record.groups else None
+        
+        menu = QMenu(self)
+        menu.addAction("Add Tab to New Group...", lambda: self.create_tab_group(browser))
+        
+        others = [g for g in self.tab_groups if g is not group]
+        if others:
+            add_menu = menu.addMenu("Add Tab to Group")
+            for other in others:
+                add_menu.addAction(other.name, lambda g=other: self.add_tab_to_group(browser, g))
+        
+        if group:
+            menu.addSeparator()
+            menu.addAction("Remove Tab from Group", lambda: self.remove_tab_from_group(browser))
+            menu.addAction("Expand Group" if group.collapsed else "Collapse Group",
+                           lambda: self.toggle_group_collapsed(group))
+            menu.addAction("Ungroup", lambda: self.ungroup_tabs(group))
+            menu.addAction("Close Group", lambda: self.close_tab_group(group))
+        
+        menu.addSeparator()
+        menu.addAction("Close Tab", lambda: self.close_tab(self.tab_index(browser)))
+        menu.exec_(pos)
+    
+    def create_tab_group(self, browser):
+        """Create a new group containing the given tab"""
+        name, ok = QInputDialog.getText(self, "New Tab Group", "Group name:",
+                                        text=f"Group {len(self.tab_groups) + 1}")
+        if ok and name.strip():
+            color = TAB_GROUP_COLORS[len(self.tab_groups) % len(TAB_GROUP_COLORS)]
+            group = TabGroup(name.strip(), color)
+            self.tab_groups.append(group)
+            self.add_tab_to_group(browser, group)
+    
+    def add_tab_to_group(self, browser, group):
+        """Move a tab into a group, keeping group members adjacent"""
+        record = self.tab_registry.get(browser.tab_id)
+        if record is None:
+            return
+        for old_group in list(record.groups):
+            self.tab_registry.remove_from_group(browser.tab_id, old_group)
+        
+        member_indices = [self.tab_registry.get(tab_id).index for tab_id in group.tab_ids]
+        self.tab_registry.add_to_group(browser.tab_id, group)
+        if member_indices:
+            last = max(member_indices)
+            target = last if record.index < last else last + 1
+            if target != record.index:
+                self.tab_bar.moveTab(record.index, target)
+        if group.collapsed:
+            self.set_group_collapsed(group, False)
+        self.prune_tab_groups()
+    
+    def remove_tab_from_group(self, browser):
+        """Take a tab out of its group"""
+        record = self.tab_registry.get(browser.tab_id)
+        if record is None:
+            return
+        for group in list(record.groups):
+            self.tab_registry.remove_from_group(browser.tab_id, group)
+            # Step out past the rest of the group so it stays contiguous
+            member_indices = [self.tab_registry.get(tab_id).index for tab_id in group.tab_ids]
+            if member_indices and record.index < max(member_indices):
+                self.tab_bar.moveTab(record.index, max(member_indices))
+        self.prune_tab_groups()
+    
+    def ungroup_tabs(self, group):
+        """Dissolve a group, leaving its tabs open"""
+        if group.collapsed:
+            self.set_group_collapsed(group, False)
+        for tab_id in list(group.tab_ids):
+            self.tab_registry.remove_from_group(tab_id, group)
+        self.prune_tab_groups()
+    
+    def close_tab_group(self, group):
+        """Close every tab in a group"""
+        if len(group.tab_ids) >= self.tabs.count():
+            # Closing the last tab would quit; leave a fresh tab behind instead
+            self.add_new_tab()
+        for tab_id in list(group.tab_ids):
+            record = self.tab_registry.get(tab_id)
+            if record is not None:
+                self.close_tab(record.index)
+        self.prune_tab_groups()
+    
+    def prune_tab_groups(self):
+        """Forget empty groups and refresh the tab bar headers"""
+        self.tab_groups = [group for group in self.tab_groups if group.tab_ids]
+        self.tab_bar.refresh_groups()
+    
+    def toggle_group_collapsed(self, group):
+        """Collapse or expand a tab group"""
+        self.set_group_collapsed(group, not group.collapsed)
+    
+    def set_group_collapsed(self, group, collapsed):
+        """Collapse (and suspend) or expand a tab group"""
+        if group.collapsed == collapsed:
+            return
+        
+        if collapsed:
+            # Move focus out of the group so every member can be suspended
+            current = self.tabs.currentWidget()
+            if current is not None and current.tab_id in group.tab_ids:
+                # Hidden tabs of other collapsed groups would expand their group when activated
+                outside = [record.index for record in self.tab_registry.records.values()
+                           if group not in record.groups
+                           and not any(other.collapsed for other in record.groups)]
+                if outside:
+                    here = self.tab_index(current)
+                    self.tabs.setCurrentIndex(min(outside, key=lambda i: abs(i - here)))
+                else:
+                    self.add_new_tab()
+        
+        group.collapsed = collapsed
+        self.tab_bar.refresh_groups()
+        
+        if collapsed:
+            # Release renderer memory; tabs reload lazily when activated
+            discarded = 0
+            for tab_id in group.tab_ids:
+                view = self.tab_registry.view(tab_id)
+                if view is not None and view.discard():
+                    discarded += 1
+            self.status_label.setText(f"Group '{group.name}' collapsed - {discarded} tabs suspended")
+    
     def on_tab_changed(self, index):
         """Handle tab change"""
         try:
             if index >= 0:
                 browser = self.tabs.widget(index)
                 if browser:
+                    # A deferred background tab loads as soon as it is shown
+                    self.load_scheduler.promote(browser)
+                    
+                    # Activating a tab of a collapsed group expands it
+                    record = self.tab_registry.get(browser.tab_id)
+                    if record is not None:
+                        for group in record.groups:
+                            if group.collapsed:
+                                self.set_group_collapsed(group, False)
+                    
                     self.update_urlbar(browser.url(), browser)
                     self.update_navigation_buttons()
                     self.update_zoom_label(browser.zoomFactor())
@@ -1937,15 +5501,9 @@ class ModernWebBrowser(QMainWindow):
                 can_back = browser.history().canGoBack()
                 can_forward = browser.history().canGoForward()
                 
+                # Disabled buttons are dimmed by the palette; no restyling needed
                 self.back_btn.setEnabled(can_back)
                 self.forward_btn.setEnabled(can_forward)
-                
-                # Update styles
-                opacity = "1.0" if can_back else "0.3"
-                self.back_btn.setStyleSheet(f"QPushButton {{ opacity: {opacity}; }}")
-                
-                opacity = "1.0" if can_forward else "0.3"
-                self.forward_btn.setStyleSheet(f"QPushButton {{ opacity: {opacity}; }}")
         except Exception as e:
             print(f"Nav button error: {e}")
     
@@ -1968,8 +5526,15 @@ class ModernWebBrowser(QMainWindow):
         if not text:
             return self.get_homepage()
         
+        # Keyword engines and bangs
+        if " " in text:
+            keyword_search = self.keyword_table.resolve(text)
+            if keyword_search:
+                self.search_suggestions.record(text)
+                return keyword_search[0]
+        
         # Check for protocol
-        if text.startswith(("http://", "https://", "file://", "ftp://", "view-source:")):
+        if text.startswith(("http://", "https://", "file://", "ftp://", "view-source:", "hixs://")):
             return text
         
         # Check for localhost/IPs
@@ -1979,6 +5544,7 @@ class ModernWebBrowser(QMainWindow):
         # Check if it's a search query
         if " " in text or not "." in text:
             search_url = SEARCH_ENGINES.get(self.current_search_engine, SEARCH_ENGINES["Google"])
+            self.search_suggestions.record(text)
             return f"{search_url}{quote(text)}"
         
         # Assume it's a domain
@@ -1988,125 +5554,6 @@ class ModernWebBrowser(QMainWindow):
         """Get homepage URL - use Google"""
         return "https://www.google.com"
     
-    def load_homepage(self, page):
-        """Load custom HTML homepage"""
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Hixs Browser</title>
-            <style>
-                * { margin: 0; padding: 0; box-sizing: border-box; }
-                body {
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    min-height: 100vh;
-                    display: flex;
-                    flex-direction: column;
-                    align-items: center;
-                    justify-content: center;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    animation: gradientBG 15s ease infinite;
-                }
-                @keyframes gradientBG {
-                    0% { background-position: 0% 50%; }
-                    50% { background-position: 100% 50%; }
-                    100% { background-position: 0% 50%; }
-                }
-                .container {
-                    text-align: center;
-                    padding: 40px;
-                    background: rgba(255, 255, 255, 0.95);
-                    border-radius: 20px;
-                    box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-                    max-width: 600px;
-                    width: 90%;
-                    animation: fadeIn 0.8s ease-out;
-                }
-                @keyframes fadeIn {
-                    from { opacity: 0; transform: translateY(20px); }
-                    to { opacity: 1; transform: translateY(0); }
-                }
-                h1 { color: #667eea; font-size: 2.5em; margin-bottom: 10px; }
-                .tagline { color: #666; font-size: 1.1em; margin-bottom: 30px; }
-                .search-box {
-                    width: 100%;
-                    padding: 15px 25px;
-                    font-size: 18px;
-                    border: 2px solid #667eea;
-                    border-radius: 50px;
-                    outline: none;
-                    transition: all 0.3s ease;
-                    box-shadow: 0 4px 15px rgba(102, 126, 234, 0.2);
-                }
-                .search-box:focus {
-                    border-color: #764ba2;
-                    box-shadow: 0 4px 20px rgba(118, 75, 162, 0.3);
-                }
-                .shortcuts {
-                    margin-top: 30px;
-                    display: flex;
-                    justify-content: center;
-                    gap: 15px;
-                    flex-wrap: wrap;
-                }
-                .shortcut {
-                    display: flex;
-                    align-items: center;
-                    gap: 8px;
-                    padding: 10px 15px;
-                    background: #f5f5f5;
-                    border-radius: 10px;
-                    font-size: 14px;
-                    color: #555;
-                    transition: all 0.3s ease;
-                }
-                .shortcut:hover {
-                    background: #667eea;
-                    color: white;
-                    transform: translateY(-2px);
-                }
-                .shortcut kbd {
-                    background: #fff;
-                    padding: 3px 8px;
-                    border-radius: 4px;
-                    font-family: monospace;
-                    font-size: 12px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }
-                .footer {
-                    margin-top: 30px;
-                    color: #888;
-                    font-size: 12px;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Hixs Browser</h1>
-                <p class="tagline">Fast, Private, Secure Browsing</p>
-                <input type="text" class="search-box" id="searchInput" 
-                       placeholder="Search the web or enter a URL..." 
-                       autofocus
-                       onkeydown="if(event.key==='Enter'){window.location.href='hixs://search/'+encodeURIComponent(this.value)}">
-                <div class="shortcuts">
-                    <div class="shortcut"><kbd>Ctrl</kbd>+<kbd>T</kbd> New Tab</div>
-                    <div class="shortcut"><kbd>Ctrl</kbd>+<kbd>W</kbd> Close Tab</div>
-                    <div class="shortcut"><kbd>Ctrl</kbd>+<kbd>R</kbd> Refresh</div>
-                    <div class="shortcut"><kbd>F11</kbd> Fullscreen</div>
-                </div>
-                <div class="footer">
-                    Hixs Browser v2.1 - Privacy First<br>
-                    Developed by: geethudinoyt (ruthvik pedapondara)
-                </div>
-            </div>
-            <script>document.getElementById('searchInput').focus();</script>
-        </body>
-        </html>
-        """
-        page.setHtml(html)
-    
     def update_urlbar(self, qurl, browser=None):
         """Update URL bar"""
         try:
@@ -2117,10 +5564,82 @@ class ModernWebBrowser(QMainWindow):
         except Exception as e:
             print(f"URL bar error: {e}")
     
+    def record_history(self, qurl, browser):
+        """Record a committed navigation of a tab"""
+        try:
+            url = qurl.toString()
+            if url == getattr(browser, 'last_recorded_url', None):
+                return
+            browser.last_recorded_url = url
+            self.predictor.on_navigation(url)
+            nav_type = browser.page().last_navigation_type
+            transition = NAVIGATION_TRANSITIONS.get(nav_type, TRANSITION_OTHER) if nav_type is not None else TRANSITION_TYPED
+            if transition != TRANSITION_RELOAD and self.history_store.record_visit(url, "", transition):
+                self.update_omnibox_index("record_visit", url, transition, time.time())
+        except Exception as e:
+            print(f"History record error: {e}")
+    
+    def record_title(self, title, browser):
+        """Store the title of a tab's current page in history"""
+        url = browser.url().toString()
+        self.history_store.update_title(url, title)
+        self.update_omnibox_index("set_title", url, title)
+    
+    def update_omnibox_index(self, method, *args):
+        """Apply an update to the omnibox index, replaying it later if a rebuild is running"""
+        getattr(self.omnibox_index, method)(*args)
+        if self.omnibox_loader is not None:
+            self.omnibox_backlog.append((method, args))
+    
+    def reload_omnibox_index(self):
+        """Rebuild the omnibox index from the databases in the background"""
+        if self.omnibox_loader is not None:
+            self.omnibox_loader.cancel()
+        self.omnibox_backlog = []  # updates made while the full index is loading
+        self.omnibox_loader = OmniboxLoader(self.history_store.path, self.bookmark_store.path, self)
+        self.omnibox_loader.loaded.connect(self.on_omnibox_loaded)
+        self.omnibox_loader.start()
+    
+    def on_omnibox_loaded(self, index):
+        if self.sender() is not self.omnibox_loader:
+            return
+        for method, args in self.omnibox_backlog:
+            getattr(index, method)(*args)
+        self.omnibox_backlog = []
+        self.omnibox_index = index
+        self.omnibox_loader = None
+    
+    def on_frecency_updated(self, changes):
+        for url, frecency in changes:
+            self.update_omnibox_index("set_frecency", url, frecency)
+    
+    def update_omnibox_suggestions(self, text):
+        """Fill the URL bar popup with history and bookmark matches"""
+        try:
+            self.omnibox_model.clear()
+            suggestions = self.omnibox_index.query(text)
+            self.predictor.predict_from_suggestions(suggestions)
+            for query in self.search_suggestions.suggest(text):
+                item = QStandardItem(f"🔍 {query}")
+                item.setData(query, Qt.UserRole)
+                self.omnibox_model.appendRow(item)
+            for url, title, bookmarked, score in suggestions:
+                label = f"{title} — {url}" if title else url
+                item = QStandardItem(f"★ {label}" if bookmarked else label)
+                item.setData(url, Qt.UserRole)
+                item.setToolTip(url)
+                self.omnibox_model.appendRow(item)
+            if self.omnibox_model.rowCount():
+                self.omnibox_completer.complete()
+            else:
+                self.omnibox_completer.popup().hide()
+        except Exception as e:
+            print(f"Autocomplete error: {e}")
+    
     def update_tab_title(self, title, browser):
         """Update tab title"""
         try:
-            index = self.tabs.indexOf(browser)
+            index = self.tab_index(browser)
             if index >= 0:
                 display_title = title[:25] + "..." if len(title) > 28 else title
                 self.tabs.setTabText(index, display_title or "Loading...")
@@ -2131,7 +5650,7 @@ class ModernWebBrowser(QMainWindow):
     def update_tab_icon(self, icon, browser):
         """Update tab icon"""
         try:
-            index = self.tabs.indexOf(browser)
+            index = self.tab_index(browser)
             if index >= 0 and not icon.isNull():
                 self.tabs.setTabIcon(index, icon)
         except Exception as e:
@@ -2162,9 +5681,10 @@ class ModernWebBrowser(QMainWindow):
             self.status_label.setText("Done" if success else "Failed to load")
             self.update_navigation_buttons()
             self.save_tabs()
-            
-            if success and self.force_dark_website:
-                browser.set_dark_mode(True)
+        
+        if success:
+            self.probe_dark_page(browser)
+        self.profiler.milestone("first_load")
     
     def go_back(self):
         """Go back"""
@@ -2210,6 +5730,7 @@ class ModernWebBrowser(QMainWindow):
         file_menu = menu.addMenu("📁 File")
         file_menu.addAction("New Tab (Ctrl+T)", lambda: self.add_new_tab())
         file_menu.addAction("Close Tab (Ctrl+W)", self.close_current_tab)
+        file_menu.addAction("Switch to Tab... (Ctrl+Shift+A)", self.show_tab_switcher)
         file_menu.addSeparator()
         file_menu.addAction("Open File... (Ctrl+O)", self.open_file)
         file_menu.addAction("Save Page As... (Ctrl+S)", self.save_page)
@@ -2237,26 +5758,46 @@ class ModernWebBrowser(QMainWindow):
         dark_action.setChecked(self.force_dark_website)
         dark_action.triggered.connect(self.toggle_force_dark_website)
         
+        engine_menu = view_menu.addMenu("Dark Mode Engine")
+        for engine, label in DARK_MODE_ENGINES.items():
+            action = engine_menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(engine == self.dark_mode_engine)
+            action.triggered.connect(lambda checked, e=engine: self.set_dark_mode_engine(e))
+        
+        current = self.tabs.currentWidget()
+        host = current.url().host() if current else ""
+        site_menu = view_menu.addMenu("Dark Mode for This Site")
+        site_menu.setEnabled(bool(host))
+        site_mode = self.site_settings.dark_modes.get(host)
+        default_action = site_menu.addAction("Default")
+        default_action.setCheckable(True)
+        default_action.setChecked(site_mode is None)
+        default_action.triggered.connect(lambda: self.set_site_dark_mode(None))
+        for mode, label in DARK_MODE_SITE_MODES.items():
+            action = site_menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(mode == site_mode)
+            action.triggered.connect(lambda checked, m=mode: self.set_site_dark_mode(m))
+        site_menu.addSeparator()
+        site_menu.addAction("Re-check If Already Dark", self.recheck_site_darkness)
+        
         # History
         history_menu = menu.addMenu("🕐 History")
         history_menu.addAction("Show All History", self.show_history)
         history_menu.addSeparator()
         
         # Add recent history items
-        browser = self.tabs.currentWidget()
-        if browser:
-            history = browser.history()
-            for i in range(min(10, history.count())):
-                item = history.itemAt(i)
-                title = item.title() or item.url().toString()
-                action = history_menu.addAction(title[:40])
-                action.triggered.connect(lambda checked, url=item.url().toString(): 
-                    self.add_new_tab(url))
+        for url, title in self.history_store.recent(10):
+            action = history_menu.addAction((title or url)[:40])
+            action.triggered.connect(lambda checked, url=url: self.add_new_tab(url))
         
         # Bookmarks
         bookmarks_menu = menu.addMenu("🔖 Bookmarks")
         bookmarks_menu.addAction("Bookmark This Page", self.bookmark_page)
         bookmarks_menu.addAction("Show Bookmarks", self.show_bookmarks)
+        bookmarks_menu.addSeparator()
+        bookmarks_menu.addAction("Import from Another Browser...", self.import_browser_data)
         
         # Downloads
         downloads_menu = menu.addMenu("📥 Downloads")
@@ -2268,12 +5809,18 @@ class ModernWebBrowser(QMainWindow):
         tools_menu = menu.addMenu("🛠️ Tools")
         tools_menu.addAction("Developer Tools (F12)", self.toggle_dev_tools)
         tools_menu.addAction("View Page Source (Ctrl+U)", self.view_page_source)
+        tools_menu.addAction("Task Manager (Shift+Esc)", self.show_task_manager)
         tools_menu.addSeparator()
+        tools_menu.addAction("Background Tab Loading...", self.set_background_load_limit)
+        tools_menu.addAction("Spare New Tabs...", self.set_spare_tab_count)
+        tools_menu.addAction("Connection Prediction...", self.show_prediction_settings)
+        tools_menu.addAction("History Retention...", self.show_history_retention)
         tools_menu.addAction("Clear Browsing Data", self.clear_browsing_data)
         
         # Privacy
         privacy_menu = menu.addMenu("🛡️ Privacy")
         privacy_menu.addAction("Privacy Dashboard", self.show_privacy_dashboard)
+        privacy_menu.addAction("Site Permissions...", self.show_site_permissions)
         
         ad_block_action = privacy_menu.addAction("Ad Blocking")
         ad_block_action.setCheckable(True)
@@ -2287,6 +5834,8 @@ class ModernWebBrowser(QMainWindow):
             action.setCheckable(True)
             action.setChecked(engine == self.current_search_engine)
             action.triggered.connect(lambda checked, e=engine: self.set_search_engine(e))
+        search_menu.addSeparator()
+        search_menu.addAction("Keyword Engines...", self.show_keyword_engines)
         
         # Theme
         theme_menu = menu.addMenu("🎨 Theme")
@@ -2392,32 +5941,39 @@ class ModernWebBrowser(QMainWindow):
         """Zoom in"""
         browser = self.tabs.currentWidget()
         if browser:
-            factor = min(browser.zoomFactor() + 0.1, 5.0)
-            browser.setZoomFactor(factor)
-            self.update_zoom_label(factor)
+            self.set_site_zoom(browser, min(browser.zoomFactor() + 0.1, 5.0))
     
     def zoom_out(self):
         """Zoom out"""
         browser = self.tabs.currentWidget()
         if browser:
-            factor = max(browser.zoomFactor() - 0.1, 0.25)
-            browser.setZoomFactor(factor)
-            self.update_zoom_label(factor)
+            self.set_site_zoom(browser, max(browser.zoomFactor() - 0.1, 0.25))
     
     def reset_zoom(self):
         """Reset zoom"""
         browser = self.tabs.currentWidget()
         if browser:
-            browser.setZoomFactor(1.0)
-            self.update_zoom_label(1.0)
+            self.set_site_zoom(browser, 1.0)
     
     def on_zoom_slider_changed(self, value):
         """Handle zoom slider change"""
         browser = self.tabs.currentWidget()
         if browser:
-            factor = value / 100.0
+            self.set_site_zoom(browser, value / 100.0)
+    
+    def set_site_zoom(self, browser, factor):
+        """Zoom a tab and remember the level for its site"""
+        browser.setZoomFactor(factor)
+        self.update_zoom_label(factor)
+        self.site_settings.set_zoom(browser.url().host(), factor)
+    
+    def apply_site_zoom(self, qurl, browser):
+        """Restore the remembered zoom of a site as soon as a navigation commits"""
+        factor = self.site_settings.zoom_for(qurl.host())
+        if abs(browser.zoomFactor() - factor) > 0.001:
             browser.setZoomFactor(factor)
-            self.update_zoom_label(factor)
+            if browser == self.tabs.currentWidget():
+                self.update_zoom_label(factor)
     
     def update_zoom_label(self, factor):
         """Update zoom label"""
@@ -2442,8 +5998,12 @@ class ModernWebBrowser(QMainWindow):
             browser.triggerPageAction(QWebEnginePage.InspectElement)
     
     def show_history(self):
-        """Show history page"""
-        self.add_new_tab("chrome://history/", "History")
+        """Show history dialog"""
+        if not self.history_dialog:
+            self.history_dialog = HistoryDialog(self, self)
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+        self.history_dialog.activateWindow()
     
     def bookmark_page(self):
         """Bookmark current page"""
@@ -2452,26 +6012,84 @@ class ModernWebBrowser(QMainWindow):
             title = browser.page().title()
             url = browser.url().toString()
             
-            bookmarks = json.loads(self.settings.value("bookmarks", "[]"))
-            bookmarks.append({"title": title, "url": url, "date": datetime.now().isoformat()})
-            self.settings.setValue("bookmarks", json.dumps(bookmarks))
-            
-            self.status_label.setText(f"Bookmarked: {title}")
+            try:
+                bookmark_id, created = self.bookmark_store.add(url, title)
+                self.update_omnibox_index("add_bookmark", url, title)
+                if created:
+                    self.status_label.setText(f"Bookmarked: {title}")
+                else:
+                    self.status_label.setText(f"Already bookmarked: {title}")
+            except sqlite3.Error as e:
+                QMessageBox.critical(self, "Bookmark Error", str(e))
     
-    def show_bookmarks(self):
-        """Show bookmarks"""
-        # Create bookmarks page
-        html = "<html><head><title>Bookmarks</title></head><body>"
-        html += "<h1>Bookmarks</h1><ul>"
-        
-        bookmarks = json.loads(self.settings.value("bookmarks", "[]"))
-        for bm in bookmarks:
-            html += f'<li><a href="{bm["url"]}">{bm["title"]}</a></li>'
-        
-        html += "</ul></body></html>"
+    def import_browser_data(self):
+        """Import history and bookmarks from Chrome or Firefox"""
+        if self.importer is not None:
+            return
+        names = list(IMPORT_BROWSERS.values())
+        name, ok = QInputDialog.getItem(self, "Import Browser Data", "Import from:", names, 0, False)
+        if not ok:
+            return
+        kind = list(IMPORT_BROWSERS)[names.index(name)]
+        file_filter = "Chrome History (History)" if kind == "chrome" else "Firefox Places (places.sqlite)"
+        path, _ = QFileDialog.getOpenFileName(self, f"{name} Profile Database",
+                                              find_browser_profile(kind), f"{file_filter};;All Files (*)")
+        if not path:
+            return
         
-        browser = self.add_new_tab(title="Bookmarks")
-        browser.setHtml(html)
+        box = QMessageBox(QMessageBox.Question, "Import Browser Data",
+                          f"Import history and bookmarks from {name}?\n\n"
+                          "A dry run imports into a scratch copy and only reports counts and timings.",
+                          parent=self)
+        import_btn = box.addButton("Import", QMessageBox.AcceptRole)
+        dry_run_btn = box.addButton("Dry Run", QMessageBox.ActionRole)
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        if box.clickedButton() not in (import_btn, dry_run_btn):
+            return
+        dry_run = box.clickedButton() is dry_run_btn
+        
+        self.import_progress = QProgressDialog(f"Importing from {name}...", "Cancel", 0, 0, self)
+        self.import_progress.setWindowTitle("Import Browser Data")
+        self.import_progress.setMinimumDuration(0)
+        self.importer = BrowserImporter(kind, path, self.history_store.path, self.bookmark_store.path,
+                                        dry_run, self)
+        self.import_progress.canceled.connect(self.importer.cancel)
+        self.importer.progress.connect(self.on_import_progress)
+        self.importer.completed.connect(self.on_import_finished)
+        self.importer.start()
+    
+    def on_import_progress(self, done, total, stage):
+        self.import_progress.setLabelText(f"Importing {stage}...")
+        self.import_progress.setMaximum(total)
+        self.import_progress.setValue(done)
+    
+    def on_import_finished(self, report):
+        self.importer.wait()
+        self.importer = None
+        self.import_progress.reset()
+        self.import_progress.deleteLater()
+        
+        if "error" in report:
+            QMessageBox.critical(self, "Import Error", report["error"])
+            return
+        counts, timings = report["counts"], report["timings"]
+        lines = [f"{stage.capitalize()}: {counts[stage]:,} rows in {timings[stage]:.2f}s" for stage in counts]
+        title = "Dry Run Complete" if report["dry_run"] else "Import Complete"
+        if report["cancelled"]:
+            title = "Import Cancelled"
+        if not report["dry_run"]:
+            self.bookmark_store.load_folders()
+            self.reload_omnibox_index()
+        QMessageBox.information(self, title, "\n".join(lines) or "Nothing was imported.")
+    
+    def show_bookmarks(self):
+        """Show bookmarks dialog"""
+        if not self.bookmarks_dialog:
+            self.bookmarks_dialog = BookmarksDialog(self, self)
+        self.bookmarks_dialog.show()
+        self.bookmarks_dialog.raise_()
+        self.bookmarks_dialog.activateWindow()
     
     def open_downloads_folder(self):
         """Open downloads folder"""
@@ -2485,8 +6103,11 @@ class ModernWebBrowser(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            # Clear cache
+            # Clear cache and history
             QWebEngineProfile.defaultProfile().clearHttpCache()
+            self.history_store.clear()
+            self.search_suggestions.clear()
+            self.update_omnibox_index("clear_history")
             self.status_label.setText("Browsing data cleared")
     
     def show_search_engine_menu(self):
@@ -2497,6 +6118,8 @@ class ModernWebBrowser(QMainWindow):
             action.setCheckable(True)
             action.setChecked(engine == self.current_search_engine)
             action.triggered.connect(lambda checked, e=engine: self.set_search_engine(e))
+        menu.addSeparator()
+        menu.addAction("Keyword Engines...", self.show_keyword_engines)
         menu.exec_(self.search_engine_btn.mapToGlobal(QPoint(0, self.search_engine_btn.height())))
     
     def set_search_engine(self, engine):
@@ -2505,6 +6128,32 @@ class ModernWebBrowser(QMainWindow):
         self.settings.setValue("search_engine", engine)
         self.search_engine_btn.setText(f"🔎 {engine}")
     
+    def show_keyword_engines(self):
+        """Edit keyword search shortcuts"""
+        KeywordEnginesDialog(self.keyword_table, self).exec_()
+    
+    def set_background_load_limit(self):
+        """Configure how many background tabs may load at once"""
+        value, ok = QInputDialog.getInt(
+            self, "Background Tab Loading",
+            "Maximum background tabs loading at the same time:",
+            self.load_scheduler.max_concurrent, 1, 16
+        )
+        if ok:
+            self.settings.setValue("background_tab_load_limit", value)
+            self.load_scheduler.set_max_concurrent(value)
+    
+    def set_spare_tab_count(self):
+        """Configure how many pre-loaded tabs are kept ready for new tabs"""
+        value, ok = QInputDialog.getInt(
+            self, "Spare New Tabs",
+            "Pre-loaded new tabs to keep ready (each uses memory; 0 disables):",
+            self.spare_tabs.size, 0, 2
+        )
+        if ok:
+            self.settings.setValue("spare_tab_count", value)
+            self.spare_tabs.set_size(value)
+    
     def toggle_ad_blocking(self):
         """Toggle ad blocking"""
         self.ad_block_enabled = not self.ad_block_enabled
@@ -2519,11 +6168,98 @@ class ModernWebBrowser(QMainWindow):
         """Toggle force dark mode"""
         self.force_dark_website = not self.force_dark_website
         self.settings.setValue("force_dark_website", self.force_dark_website)
-        
+        self.update_dark_mode_script()
+        self.restyle_tabs()
+    
+    def dark_mode_script(self):
+        """Dark mode script source for the current settings and site overrides"""
+        return DARK_MODE_JS % {
+            "overrides": json.dumps(self.dark_mode_overrides()),
+            "default_mode": json.dumps(self.dark_mode_engine if self.force_dark_website else "off"),
+            "native": "true" if self.native_dark_mode else "false",
+            "opt_out_css": json.dumps(DARK_MODE_OPT_OUT_CSS),
+            "dark_css": json.dumps(DARK_MODE_CSS),
+        }
+    
+    def dark_mode_overrides(self):
+        """Per-host dark modes: explicit choices, else "off" for sites found to be dark already"""
+        if not self.force_dark_website:
+            return {}
+        overrides = {host: "off" for host, is_dark in self.site_settings.dark_verdicts.items() if is_dark}
+        overrides.update(self.site_settings.dark_modes)
+        return overrides
+    
+    def probe_dark_page(self, browser):
+        """Check once per host whether a page is dark on its own"""
+        host = browser.url().host()
+        if (not self.force_dark_website or not host or host in self.site_settings.dark_verdicts
+                or host in self.site_settings.dark_modes):
+            return
+        browser.page().runJavaScript(DARK_PAGE_PROBE_JS, QWebEngineScript.ApplicationWorld,
+                                     lambda luminance, h=host: self.on_dark_probe_result(h, luminance))
+    
+    def on_dark_probe_result(self, host, luminance):
+        if not isinstance(luminance, (int, float)) or host in self.site_settings.dark_verdicts:
+            return
+        is_dark = luminance < DARK_PAGE_LUMINANCE
+        self.site_settings.set_dark_verdict(host, is_dark)
+        if is_dark:
+            self.update_dark_mode_script()
+            self.restyle_tabs(host)
+    
+    def recheck_site_darkness(self):
+        """Forget the cached verdict for the current site and probe it again"""
+        browser = self.tabs.currentWidget()
+        host = browser.url().host() if browser else ""
+        if host:
+            self.site_settings.set_dark_verdict(host, None)
+            self.update_dark_mode_script()
+            self.restyle_tabs(host)
+            self.probe_dark_page(browser)
+    
+    def restyle_tabs(self, host=None):
+        """Re-run the dark mode script in open tabs, optionally only those showing host"""
+        script = self.dark_mode_script()
         for i in range(self.tabs.count()):
             browser = self.tabs.widget(i)
-            if browser:
-                browser.set_dark_mode(self.force_dark_website)
+            if browser and (host is None or browser.url().host() == host):
+                browser.set_dark_mode(self.force_dark_website, script)
+    
+    def set_site_dark_mode(self, mode):
+        """Override dark mode for the current site; None follows the global setting"""
+        browser = self.tabs.currentWidget()
+        host = browser.url().host() if browser else ""
+        if not host:
+            return
+        self.site_settings.set_dark_mode(host, mode)
+        self.update_dark_mode_script()
+        self.restyle_tabs(host)
+    
+    def set_dark_mode_engine(self, engine):
+        """Choose between Chromium's dark rendering and the CSS filter"""
+        self.dark_mode_engine = engine
+        self.settings.setValue("dark_mode_engine", engine)
+        self.update_dark_mode_script()
+        self.restyle_tabs()
+        if (engine == "native") != self.native_dark_mode:
+            QMessageBox.information(self, "Dark Mode Engine",
+                                    "Restart the browser to switch Chromium's dark rendering on or off.")
+    
+    def update_dark_mode_script(self):
+        """Register the dark mode user script on the profile, or remove it"""
+        scripts = QWebEngineProfile.defaultProfile().scripts()
+        for script in scripts.findScripts(DARK_MODE_SCRIPT_NAME):
+            scripts.remove(script)
+        if self.force_dark_website or self.native_dark_mode:
+            # Document creation in an isolated world: styles every frame
+            # before first paint without exposing anything to page scripts
+            script = QWebEngineScript()
+            script.setName(DARK_MODE_SCRIPT_NAME)
+            script.setSourceCode(self.dark_mode_script())
+            script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+            script.setWorldId(QWebEngineScript.ApplicationWorld)
+            script.setRunsOnSubFrames(True)
+            scripts.insert(script)
     
     def toggle_theme(self):
         """Toggle theme"""
@@ -2538,101 +6274,22 @@ class ModernWebBrowser(QMainWindow):
             self.toggle_theme()
     
     def apply_theme(self):
-        """Apply theme stylesheet"""
-        if self.dark_mode:
-            self.setStyleSheet("""
-                QMainWindow { background-color: #1e1e1e; }
-                QToolBar { 
-                    background-color: #2d2d2d; 
-                    border: none; 
-                    padding: 4px;
-                    spacing: 4px;
-                }
-                QPushButton {
-                    background-color: #3d3d3d;
-                    border: 1px solid #4d4d4d;
-                    border-radius: 4px;
-                    color: #ffffff;
-                }
-                QPushButton:hover { background-color: #4d4d4d; }
-                QPushButton:pressed { background-color: #2d2d2d; }
-                QPushButton:disabled { color: #666; }
-                QLineEdit {
-                    background-color: #3d3d3d;
-                    border: 1px solid #4d4d4d;
-                    color: #ffffff;
-                }
-                QLineEdit:focus { border-color: #4285f4; }
-                QTabWidget::pane { border: 1px solid #3d3d3d; background-color: #1e1e1e; }
-                QTabBar::tab {
-                    background-color: #2d2d2d;
-                    color: #cccccc;
-                    padding: 8px 16px;
-                    margin-right: 2px;
-                    border-top-left-radius: 4px;
-                    border-top-right-radius: 4px;
-                }
-                QTabBar::tab:selected {
-                    background-color: #1e1e1e;
-                    border-bottom: 2px solid #4285f4;
-                    color: #ffffff;
-                }
-                QTabBar::tab:hover:!selected { background-color: #3d3d3d; }
-                QStatusBar { background-color: #2d2d2d; color: #cccccc; }
-                QLabel { color: #cccccc; }
-                QMenu {
-                    background-color: #2d2d2d;
-                    color: #ffffff;
-                    border: 1px solid #3d3d3d;
-                }
-                QMenu::item:selected { background-color: #4285f4; }
-                QProgressBar { border: none; background-color: transparent; }
-                QProgressBar::chunk { background-color: #4285f4; }
-            """)
-        else:
-            self.setStyleSheet("""
-                QMainWindow { background-color: #f5f5f5; }
-                QToolBar { 
-                    background-color: #ffffff; 
-                    border: none;
-                    padding: 4px;
-                    spacing: 4px;
-                }
-                QPushButton {
-                    background-color: #ffffff;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 4px;
-                }
-                QPushButton:hover { background-color: #f0f0f0; }
-                QPushButton:pressed { background-color: #e8e8e8; }
-                QPushButton:disabled { color: #aaa; }
-                QLineEdit {
-                    background-color: #ffffff;
-                    border: 1px solid #e0e0e0;
-                }
-                QLineEdit:focus { border-color: #4285f4; }
-                QTabWidget::pane { border: 1px solid #e0e0e0; background-color: #ffffff; }
-                QTabBar::tab {
-                    background-color: #f8f8f8;
-                    padding: 8px 16px;
-                    margin-right: 2px;
-                    border-top-left-radius: 4px;
-                    border-top-right-radius: 4px;
-                }
-                QTabBar::tab:selected {
-                    background-color: #ffffff;
-                    border-bottom: 2px solid #4285f4;
-                }
-                QTabBar::tab:hover:!selected { background-color: #f0f0f0; }
-                QStatusBar { background-color: #ffffff; }
-                QMenu {
-                    background-color: #ffffff;
-                    border: 1px solid #e0e0e0;
-                }
-                QMenu::item:selected { background-color: #f0f0f0; }
-                QProgressBar { border: none; background-color: transparent; }
-                QProgressBar::chunk { background-color: #4285f4; }
-            """)
+        """Switch the application palette; the shared stylesheet takes its colors from it"""
+        name = "dark" if self.dark_mode else "light"
+        palette = self.theme_palettes.get(name)
+        if palette is None:
+            palette = self.theme_palettes[name] = theme_palette(THEMES[name])
+        QApplication.setPalette(palette)
+        if not self.isVisible():
+            return  # nothing has been polished yet
+        style = self.style()
+        for widget in self.findChildren(THEMED_WIDGETS):
+            style.unpolish(widget)
+            style.polish(widget)
+    
+    def show_site_permissions(self):
+        """Review remembered permission decisions"""
+        PermissionsDialog(self.site_settings, self).exec_()
     
     def show_privacy_dashboard(self):
         """Show privacy dashboard"""
@@ -2668,6 +6325,99 @@ class ModernWebBrowser(QMainWindow):
         dialog.setLayout(layout)
         dialog.exec_()
     
+    def show_history_retention(self):
+        """Configure how long history is kept"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("History Retention")
+        
+        layout = QGridLayout(dialog)
+        layout.addWidget(QLabel("Delete history older than:"), 0, 0)
+        age_spin = QSpinBox()
+        age_spin.setRange(0, 3650)
+        age_spin.setSuffix(" days")
+        age_spin.setSpecialValueText("Never")
+        age_spin.setValue(self.settings.value("history_max_age_days", 365, type=int))
+        layout.addWidget(age_spin, 0, 1)
+        
+        layout.addWidget(QLabel("Keep at most:"), 1, 0)
+        visits_spin = QSpinBox()
+        visits_spin.setRange(0, 10000000)
+        visits_spin.setSingleStep(10000)
+        visits_spin.setSuffix(" visits")
+        visits_spin.setSpecialValueText("Unlimited")
+        visits_spin.setValue(self.settings.value("history_max_visits", 1000000, type=int))
+        layout.addWidget(visits_spin, 1, 1)
+        
+        note = QLabel("Old entries are removed gradually in the background.")
+        note.setStyleSheet("color: gray;")
+        layout.addWidget(note, 2, 0, 1, 2)
+        
+        btn_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btn_box.accepted.connect(dialog.accept)
+        btn_box.rejected.connect(dialog.reject)
+        layout.addWidget(btn_box, 3, 0, 1, 2)
+        
+        if dialog.exec_() == QDialog.Accepted:
+            self.settings.setValue("history_max_age_days", age_spin.value())
+            self.settings.setValue("history_max_visits", visits_spin.value())
+            self.history_store.set_retention(age_spin.value(), visits_spin.value())
+    
+    def show_prediction_settings(self):
+        """Show preconnect settings and how often predictions were right"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Connection Prediction")
+        dialog.setMinimumSize(420, 300)
+        
+        layout = QVBoxLayout()
+        
+        stats = QLabel(f"<h3>Prediction Accuracy</h3>{self.predictor.summary()}")
+        stats.setWordWrap(True)
+        layout.addWidget(stats)
+        
+        enabled_check = QCheckBox("Preconnect to likely sites while typing and hovering links")
+        enabled_check.setChecked(self.predictor.enabled)
+        layout.addWidget(enabled_check)
+        
+        prerender_check = QCheckBox("Also prerender the top suggestion (uses more memory)")
+        prerender_check.setChecked(self.predictor.prerender)
+        layout.addWidget(prerender_check)
+        
+        confidence_label = QLabel()
+        confidence_slider = QSlider(Qt.Horizontal)
+        confidence_slider.setRange(10, 100)
+        confidence_slider.valueChanged.connect(
+            lambda value: confidence_label.setText(f"Minimum confidence: {value}%"))
+        confidence_slider.setValue(int(self.predictor.min_confidence * 100))
+        layout.addWidget(confidence_label)
+        layout.addWidget(confidence_slider)
+        
+        reset_btn = QPushButton("Reset Statistics")
+        reset_btn.clicked.connect(lambda: (self.predictor.reset_stats(),
+                                           stats.setText(f"<h3>Prediction Accuracy</h3>{self.predictor.summary()}")))
+        layout.addWidget(reset_btn)
+        
+        layout.addStretch()
+        
+        btn_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btn_box.accepted.connect(dialog.accept)
+        btn_box.rejected.connect(dialog.reject)
+        layout.addWidget(btn_box)
+        
+        dialog.setLayout(layout)
+        if dialog.exec_() == QDialog.Accepted:
+            self.predictor.enabled = enabled_check.isChecked()
+            self.predictor.prerender = prerender_check.isChecked()
+            self.predictor.min_confidence = confidence_slider.value() / 100
+            self.predictor.save()
+    
+    def show_task_manager(self):
+        """Show per-tab resource usage"""
+        if not self.task_manager:
+            self.task_manager = TaskManagerDialog(self, self)
+        self.task_manager.show()
+        self.task_manager.raise_()
+        self.task_manager.activateWindow()
+    
     def increment_tracker_count(self):
         """Increment tracker counter"""
         self.tracker_count += 1
@@ -2690,7 +6440,9 @@ class ModernWebBrowser(QMainWindow):
             for i in range(self.tabs.count()):
                 browser = self.tabs.widget(i)
                 if browser:
-                    url = browser.url().toString()
+                    # Background tabs still waiting in the load queue have no URL yet
+                    qurl = self.load_scheduler.pending_url(browser) or browser.url()
+                    url = qurl.toString()
                     if url and not url.startswith("view-source:"):
                         tabs_data.append({
                             "url": url,
@@ -2708,6 +6460,7 @@ class ModernWebBrowser(QMainWindow):
             tabs_data = json.loads(tabs_json)
             
             if tabs_data and len(tabs_data) > 0:
+                # The prompt waits for the user, so profiled startups include that time
                 reply = QMessageBox.question(
                     self, "Restore Session",
                     f"Restore {len(tabs_data)} tabs from last session?",
@@ -2719,13 +6472,26 @@ class ModernWebBrowser(QMainWindow):
                     if self.tabs.count() == 1:
                         browser = self.tabs.widget(0)
                         if browser and browser.url().toString() == self.get_homepage():
-                            self.tabs.removeTab(0)
+                            self.remove_tab_at(0)
+                            browser.deleteLater()
                     
-                    for tab in tabs_data:
-                        self.add_new_tab(tab["url"], tab["title"])
+                    # Restored tabs load in the background through the scheduler
+                    for i, tab in enumerate(tabs_data):
+                        self.add_new_tab(tab["url"], tab["title"], background=i > 0)
                         
         except Exception as e:
             print(f"Load tabs error: {e}")
+        self.profiler.milestone("session_restored")
+    
+    def open_external_urls(self, urls):
+        """Open URLs handed over by another launch and bring the window to the front"""
+        for url in urls:
+            self.add_new_tab(url)
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
     
     def focus_url_bar(self):
         """Focus URL bar"""
@@ -2801,28 +6567,54 @@ class ModernWebBrowser(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close"""
+        self.shut_down()
+        event.accept()
+    
+    def shut_down(self):
+        """Save the session, stop worker threads and flush every store; runs once"""
+        if self.shut_down_done:
+            return
+        self.shut_down_done = True
         self.save_tabs()
+        self.spare_tabs.clear()
         # Stop all downloads
         for download_id, (thread, path) in list(self.download_manager.active_downloads.items()):
             thread.cancel()
             thread.wait(1000)
-        event.accept()
+        self.predictor.save()
+        self.search_suggestions.save()
+        self.site_settings.close()
+        if self.omnibox_loader is not None:
+            self.omnibox_loader.cancel()
+            self.omnibox_loader.wait(2000)
+        if self.importer is not None:
+            self.importer.cancel()
+            self.importer.wait(5000)
+        self.history_store.close()
 
 
 if __name__ == "__main__":
-    # Enable High DPI support
-    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
-    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    profiler = StartupProfiler.from_argv(sys.argv)
+    profiler.mark("imports")
     
-    app = QApplication(sys.argv)
-    app.setApplicationName("Hixs Browser")
-    app.setOrganizationName("Hixs Studios")
+    app = create_application(sys.argv)
+    profiler.mark("qapplication")
     
-    # Set application font
-    font = QFont("Segoe UI", 9)
-    app.setFont(font)
+    # Hand the URLs to an already running browser instead of starting a second one
+    urls = command_line_urls(sys.argv)
+    instance = None
+    if "--new-instance" not in sys.argv:
+        instance = SingleInstance()
+        if instance.forward(urls) or not instance.listen(urls):
+            sys.exit(0)
     
-    browser = ModernWebBrowser()
+    browser = ModernWebBrowser(profiler)
     browser.show()
+    profiler.mark("show")
+    if instance is not None:
+        instance.urls_received.connect(browser.open_external_urls)
+        app.aboutToQuit.connect(instance.close)
+    for url in urls:
+        browser.add_new_tab(url)
     
     sys.exit(app.exec_())
\ No newline at end of file